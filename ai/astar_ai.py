@@ -2,15 +2,22 @@
 import numpy as np
 import heapq
 import random
+from geometry import geometry_for, square_geometry
 from .move_utils import get_valid_moves, get_jump_moves
 
 class AStarAI:
-    def __init__(self, player_id):
+    def __init__(self, player_id, geometry=None, seed=None):
         self.player_id = player_id
+        self.rng = random.Random(seed)
+        self.geometry = geometry or square_geometry(4 if player_id > 2 else 2)
 
-    def choose_move(self, board):
+    def reseed(self, seed):
+        self.rng.seed(seed)
+
+    def choose_move(self, board, deadline=None):
+        self.geometry = geometry_for(board)
         positions = [tuple(pos) for pos in np.argwhere(board == self.player_id)]
-        random.shuffle(positions)
+        self.rng.shuffle(positions)
         for pos in positions:
             if self.in_target_area(pos):
                 continue
@@ -22,7 +29,7 @@ class AStarAI:
         for pos in positions:
             if self.in_target_area(pos):
                 continue
-            for move in get_valid_moves(pos, board) + get_jump_moves(pos, board):
+            for move in self.get_neighbors(pos, board):
                 h = self.heuristic(move)
                 if h < best_h:
                     best_h = h
@@ -48,15 +55,8 @@ class AStarAI:
         return None
 
     def heuristic(self, pos):
-        if self.player_id == 1:
-            target = (9, 9)
-        elif self.player_id == 2:
-            target = (9, 0)
-        elif self.player_id == 3:
-            target = (0, 9)
-        elif self.player_id == 4:
-            target = (0, 0)
-        return abs(pos[0] - target[0]) + abs(pos[1] - target[1])
+        # 到最深目标格的距离（查预计算的距离表）
+        return int(self.geometry.target_distance[self.player_id][pos])
 
     def reconstruct_path(self, came_from, current):
         path = [current]
@@ -67,15 +67,8 @@ class AStarAI:
         return path
 
     def get_neighbors(self, pos, board):
-        return get_valid_moves(pos, board) + get_jump_moves(pos, board)
+        return get_valid_moves(pos, board, self.geometry) + get_jump_moves(pos, board, self.geometry)
 
     def in_target_area(self, pos):
-        if self.player_id == 1:
-            return pos[0] >= 9 and pos[1] >= 9
-        elif self.player_id == 2:
-            return pos[0] >= 9 and pos[1] < 3
-        elif self.player_id == 3:
-            return pos[0] < 3 and pos[1] >= 9
-        elif self.player_id == 4:
-            return pos[0] < 3 and pos[1] < 3
-        return False
+        mask = self.geometry.target_masks.get(self.player_id)
+        return mask is not None and bool(mask[pos])
@@ -0,0 +1,78 @@
+# ai/eval_cache.py
+"""
+局面评估缓存：按局面键缓存评估结果，容量有限，按最近最少使用（LRU）淘汰。
+
+同一局中相邻两次搜索的叶子局面大量重叠，多个 AI 共用一个缓存时还能互相复用结果。
+键由调用方给出，通常为 (评估种类, 几何, 玩家, position_key(board))。
+"""
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 100_000
+
+_MISSING = object()
+_shared = None
+
+
+def position_key(board):
+    """
+    局面的 64 位哈希（同置换表的做法，只存哈希不存局面；冲突概率可忽略）。
+    不同几何的棋盘尺寸不同，需与几何一起作为键
+    """
+    return hash(board.tobytes())
+
+
+class EvalCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize 至少为 1")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key, compute):
+        """返回 key 对应的缓存值；未命中时调用 compute() 计算并存入"""
+        entries = self.entries
+        value = entries.get(key, _MISSING)
+        if value is not _MISSING:
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = entries[key] = compute()
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"size": len(self.entries), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4)}
+
+
+def shared_cache():
+    """进程内所有 AI 共用的缓存实例"""
+    global _shared
+    if _shared is None:
+        _shared = EvalCache()
+    return _shared
+
+
+def resolve_cache(eval_cache):
+    """AI 构造参数 eval_cache 的取值：None/False 不缓存，True 使用共享缓存，也可直接传入 EvalCache"""
+    if eval_cache is True:
+        return shared_cache()
+    if eval_cache is None or eval_cache is False:
+        return None
+    return eval_cache
@@ -1,61 +1,50 @@
 # ai/greedy_ai.py
 import numpy as np
 import random
-from .move_utils import get_valid_moves, get_jump_moves, free_up_target_entry
+from geometry import geometry_for, square_geometry
+from .move_utils import get_valid_moves, get_jump_moves, get_moves_array, free_up_target_entry
 
 class GreedyAI:
-    def __init__(self, player_id):
+    def __init__(self, player_id, vectorized=True, geometry=None, seed=None):
         self.player_id = player_id
+        self.rng = random.Random(seed)
+        # vectorized=True 时用 NumPy 一次性生成并评分所有候选走法，结果与逐个评分完全一致
+        self.vectorized = vectorized
+        self.geometry = geometry or square_geometry(4 if player_id > 2 else 2)
+        self._tables = None
+
+    def reseed(self, seed):
+        self.rng.seed(seed)
 
     def get_deep_target(self):
-        if self.player_id == 1:
-            return (11, 11)
-        elif self.player_id == 2:
-            return (0, 0)
-        elif self.player_id == 3:
-            return (0, 11)
-        elif self.player_id == 4:
-            return (11, 0)
-        return None
+        return self.geometry.deep_target.get(self.player_id)
 
     def in_target_area(self, pos):
-        if self.player_id == 1:
-            return pos[0] >= 9 and pos[1] >= 9
-        elif self.player_id == 2:
-            return pos[0] < 3 and pos[1] < 3
-        elif self.player_id == 3:
-            return pos[0] < 3 and pos[1] >= 9
-        elif self.player_id == 4:
-            return pos[0] >= 9 and pos[1] < 3
-        return False
+        mask = self.geometry.target_masks.get(self.player_id)
+        return mask is not None and bool(mask[pos])
 
     def in_stable_area(self, pos):
-        if self.player_id == 1:
-            return pos[0] >= 10 and pos[1] >= 10
-        elif self.player_id == 2:
-            return pos[0] <= 1 and pos[1] <= 1
-        elif self.player_id == 3:
-            return pos[0] <= 1 and pos[1] >= 10
-        elif self.player_id == 4:
-            return pos[0] >= 10 and pos[1] <= 1
-        return False
+        # 目标区域最深的两层视为稳定区，棋子到达后不再移动
+        return self.in_target_area(pos) and self.calculate_score(pos) <= 1
 
     def calculate_score(self, pos):
-        # 曼哈顿距离作为评分，距离越短表示位置越理想
-        deep_target = self.get_deep_target()
-        return abs(pos[0] - deep_target[0]) + abs(pos[1] - deep_target[1])
+        # 到深层目标的距离作为评分（方格棋盘为曼哈顿距离），距离越短表示位置越理想
+        return int(self.geometry.target_distance[self.player_id][pos])
 
-    def choose_move(self, board):
+    def choose_move(self, board, deadline=None):
+        self.geometry = geometry_for(board)
+        if self.vectorized:
+            return self.choose_move_vectorized(board)
         deep_target = self.get_deep_target()
         # 第一步：如果深层目标单元为空，尝试直接将某个棋子移动到深层目标上
         if board[deep_target] == 0:
             positions = [tuple(p) for p in np.argwhere(board == self.player_id)]
             for pos in positions:
-                valid_moves = get_valid_moves(pos, board) + get_jump_moves(pos, board)
+                valid_moves = get_valid_moves(pos, board, self.geometry) + get_jump_moves(pos, board, self.geometry)
                 if deep_target in valid_moves:
                     return (pos, deep_target)
         # 第二步：尝试调用腾挪入口的走法（free_up_target_entry）
-        move_to_free = free_up_target_entry(board, self.player_id)
+        move_to_free = free_up_target_entry(board, self.player_id, self.geometry)
         if move_to_free:
             return move_to_free
 
@@ -72,11 +61,11 @@ class GreedyAI:
         best_improvement = -float('inf')
         fallback_move = None
         best_fallback = float('inf')
-        random.shuffle(positions_to_consider)
+        self.rng.shuffle(positions_to_consider)
         for pos in positions_to_consider:
             if self.in_target_area(pos) and self.in_stable_area(pos):
                 continue
-            candidate_moves = get_valid_moves(pos, board) + get_jump_moves(pos, board)
+            candidate_moves = get_valid_moves(pos, board, self.geometry) + get_jump_moves(pos, board, self.geometry)
             if self.in_target_area(pos):
                 candidate_moves = [m for m in candidate_moves if self.in_target_area(m)]
             
@@ -93,3 +82,66 @@ class GreedyAI:
                     best_fallback = new_score
                     fallback_move = (pos, candidate)
         return best_move if best_move is not None else fallback_move
+
+    def get_tables(self):
+        """按当前几何预计算每格的目标区/稳定区标记与评分"""
+        if self._tables is None or self._tables[0] is not self.geometry:
+            in_target = self.geometry.target_masks[self.player_id]
+            scores = self.geometry.target_distance[self.player_id]
+            in_stable = in_target & (scores <= 1)
+            self._tables = (self.geometry, in_target, in_stable, scores)
+        return self._tables[1:]
+
+    def choose_move_vectorized(self, board):
+        """choose_move 的向量化实现：候选走法与评分均为数组运算，随机数消耗与逐个评分相同"""
+        deep_target = self.get_deep_target()
+        in_target, in_stable, scores = self.get_tables()
+        all_positions = np.argwhere(board == self.player_id)
+        # 所有棋子的走法只生成一次，后续各步骤按下标筛选
+        src, dst, piece = get_moves_array(board, all_positions, self.geometry)
+        # 第一步：深层目标单元为空时，按棋子顺序找第一个能直接到达它的走法
+        if board[deep_target] == 0:
+            hit = np.flatnonzero((dst[:, 0] == deep_target[0]) & (dst[:, 1] == deep_target[1]))
+            if hit.size:
+                return (tuple(int(v) for v in src[hit[0]]), deep_target)
+        # 第二步：腾挪目标入口
+        move_to_free = free_up_target_entry(board, self.player_id, self.geometry)
+        if move_to_free:
+            return move_to_free
+
+        # 第三步：正常策略
+        pos_in_target = in_target[all_positions[:, 0], all_positions[:, 1]]
+        pos_in_stable = in_stable[all_positions[:, 0], all_positions[:, 1]]
+        outside = ~pos_in_target
+        considered = np.flatnonzero(outside if outside.any() else ~pos_in_stable)
+        bonus = 100 if np.count_nonzero(outside) == 1 else 20
+
+        # 打乱顺序：对等长列表调用 rng.shuffle，同一种子下得到的排列与逐个评分版本一致
+        order = list(range(len(considered)))
+        self.rng.shuffle(order)
+        considered = considered[order]
+        considered = considered[~(pos_in_target[considered] & pos_in_stable[considered])]
+
+        # 按打乱后的棋子顺序重排走法（同一棋子的走法保持原有方向顺序）
+        rank = np.full(len(all_positions), -1)
+        rank[considered] = np.arange(len(considered))
+        move_rank = rank[piece]
+        selected = np.flatnonzero(move_rank >= 0)
+        selected = selected[np.argsort(move_rank[selected], kind="stable")]
+        src, dst = src[selected], dst[selected]
+
+        src_in_target = in_target[src[:, 0], src[:, 1]]
+        dst_in_target = in_target[dst[:, 0], dst[:, 1]]
+        # 已在目标区域内的棋子只考虑留在目标区域内的走法
+        allowed = ~src_in_target | dst_in_target
+        if not allowed.any():
+            # 原实现的 fallback 只在没有任何候选走法时才会生效，此时结果同样为 None
+            return None
+        src, dst = src[allowed], dst[allowed]
+        src_in_target, dst_in_target = src_in_target[allowed], dst_in_target[allowed]
+
+        new_score = scores[dst[:, 0], dst[:, 1]]
+        improvement = scores[src[:, 0], src[:, 1]] - new_score + bonus * (~src_in_target & dst_in_target)
+        # argmax 取第一个最大值，与逐个比较时的严格大于等价
+        best = int(np.argmax(improvement))
+        return (tuple(int(v) for v in src[best]), tuple(int(v) for v in dst[best]))
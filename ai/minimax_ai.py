@@ -1,58 +1,327 @@
 # ai/minimax_ai.py
+import math
+import time
 import numpy as np
-import random
-from .move_utils import get_all_moves, free_up_target_entry
+from board import target_status, piece_lists
+from geometry import geometry_for, square_geometry
+from .move_utils import get_all_moves, get_all_jump_moves, free_up_target_entry
+from .eval_cache import position_key, resolve_cache
+
+# 渴望窗口的初始半宽（距离评估的单位，一步普通走法约改变 1）
+ASPIRATION_WINDOW = 4
+
+INF = float('inf')
+
+
+class SearchTimeout(Exception):
+    """搜索超过截止时刻"""
+
 
 class MinimaxAI:
-    def __init__(self, player_id, depth=2):
+    def __init__(self, player_id, depth=2, geometry=None, eval_cache=None, evaluator=None,
+                 quiescence=0, aspiration=ASPIRATION_WINDOW):
         self.player_id = player_id
         self.depth = depth
+        # 静态搜索（jump 延伸）的最大步数：到达搜索深度后只继续搜索向前的跳跃走法，
+        # 直到双方都没有向前的跳跃或达到此上限；0 表示在搜索深度处直接评估
+        self.quiescence = quiescence
+        # 渴望窗口半宽：以上一轮迭代的评分为中心缩小根节点窗口，落在窗口外再放宽重搜；
+        # None/0 表示不使用（此时不限时的搜索也不做迭代加深）
+        self.aspiration = aspiration
+        self.deadline = None
+        # 外部停止信号（带 is_set() 的对象，如 threading.Event）：置位后搜索像超时一样结束，
+        # 返回最近一次完整迭代的结果；后台预测搜索（ai/ponder.py）用它取消搜索
+        self.stop_event = None
+        # 本次 choose_move 搜索的节点数（含静态搜索节点）
+        self.nodes = 0
+        # 最近一次完整迭代的搜索信息：depth, score, nodes, pv（主要变例），供界面和引擎显示
+        self.last_info = {}
+        # 主要变例：pv_table[剩余深度] 为该深度节点下当前最佳的走法序列；
+        # prev_pv 为上一轮迭代的主要变例，按层优先搜索其中的走法
+        self.pv_table = {}
+        self.prev_pv = []
+        self.root_depth = 0
+        # 搜索期间各玩家的棋子列表（board.PieceList），由 make_move / unmake_move 与当前节点同步；
+        # 不在搜索中时为 None
+        self.pieces = None
+        self.movers = []
+        self.geometry = geometry or square_geometry(4 if player_id > 2 else 2)
+        # 局面评估缓存：True 使用进程内共享的缓存，也可传入 EvalCache 实例
+        self.eval_cache = resolve_cache(eval_cache)
+        # 学习得到的评估器（如 nn_eval.MLPEvaluator 或其权重文件路径）；
+        # 给定时替代距离评估，并在最后一层把同一父节点的全部叶子批量评估
+        self.evaluator = None
+        self.leaf_batch = None
+        if evaluator is not None:
+            from .nn_eval import LeafBatch, load_evaluator
+            self.evaluator = load_evaluator(evaluator)
+            # 批量评估假定最后一层的子节点都是叶子，启用静态搜索时不适用
+            if not quiescence:
+                self.leaf_batch = LeafBatch(self.evaluator)
 
-    def choose_move(self, board):
-        move_to_free = free_up_target_entry(board, self.player_id)
+    def choose_move(self, board, deadline=None):
+        """
+        deadline: time.perf_counter() 时间轴上的截止时刻；给定时按迭代加深搜索，
+        超时则返回最近一次完整迭代的最佳走法
+        """
+        self.geometry = geometry_for(board)
+        self.last_info = {}
+        if self.evaluator is not None and (self.evaluator.geometry is not self.geometry
+                                           or self.evaluator.player_id != self.player_id):
+            raise ValueError(f"评估器适用于 {self.evaluator.geometry} 的玩家 {self.evaluator.player_id}，"
+                             f"与当前对局不符")
+        move_to_free = free_up_target_entry(board, self.player_id, self.geometry)
         if move_to_free:
             return move_to_free
         
-        moves = get_all_moves(board, self.player_id)
+        self.pieces = piece_lists(board, self.geometry)
+        self.movers = []
+        moves = get_all_moves(board, self.player_id, geometry=self.geometry, pieces=self.pieces[self.player_id])
         if not moves:
+            self.pieces = None
             return None
-        best_val = -float('inf')
-        best_move = None
-        for move in moves:
-            new_board = self.simulate_move(board, move)
-            val = self.min_value(new_board, self.depth - 1, -float('inf'), float('inf'))
+        self.nodes = 0
+        self.prev_pv = []
+        if deadline is None and not self.aspiration:
+            try:
+                best_move = self.search_root(board, moves, self.depth)
+            finally:
+                self.pieces = None
+            self.last_info.update(depth=self.depth, nodes=self.nodes)
+            return best_move
+        self.deadline = deadline
+        best_move = moves[0]
+        try:
+            for depth in range(1, self.depth + 1):
+                best_move = self.search_root(board, moves, depth)
+                self.last_info.update(depth=depth, nodes=self.nodes)
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.pieces = None
+        # 保证 pv 为最后一项（协议的 info 行中 pv 之后的内容都视为走法）
+        if "pv" in self.last_info:
+            self.last_info["pv"] = self.last_info.pop("pv")
+        return best_move
+
+    def score_move(self, board, move):
+        """
+        在 self.depth 层的搜索下 move 的评分（与 last_info["score"] 同一尺度），供对局分析比较实际走法与最佳走法；
+        根节点只有这一个走法，按完整窗口搜索。不记录评分的 AI（多人搜索）返回 None
+        """
+        self.geometry = geometry_for(board)
+        self.last_info = {}
+        self.pieces = piece_lists(board, self.geometry)
+        self.movers = []
+        self.nodes = 0
+        self.prev_pv = []
+        try:
+            self.search_root(board, [move], self.depth)
+        finally:
+            self.pieces = None
+        return self.last_info.get("score")
+
+    def search_root(self, board, moves, depth):
+        """
+        深度 depth 的一轮根节点搜索，返回最佳走法，评分和主要变例记入 last_info。
+        有上一轮评分时先在渴望窗口内搜索，失败（落在窗口外）时把对应一侧放宽到无穷再搜
+        """
+        self.root_depth = depth
+        if depth == 1 and self.leaf_batch is not None:
+            values = self.leaf_batch.evaluate_children(board, moves)
+            best = int(np.argmax(values))
+            self.record_root(float(values[best]), [moves[best]])
+            return moves[best]
+        moves = self.order_root(moves)
+        previous = self.last_info.get("score")
+        alpha, beta = -INF, INF
+        if self.aspiration and previous is not None:
+            alpha, beta = previous - self.aspiration, previous + self.aspiration
+        while True:
+            value, best_move = self.search_window(board, moves, depth, alpha, beta)
+            if value <= alpha:
+                alpha = -INF
+            elif value >= beta:
+                beta = INF
+            else:
+                break
+        self.record_root(value, [best_move] + self.pv_table.get(depth - 1, []))
+        return best_move
+
+    def order_root(self, moves):
+        """上一轮的最佳走法排在最前，其余保持原顺序"""
+        if self.prev_pv and self.prev_pv[0] in moves:
+            first = self.prev_pv[0]
+            return [first] + [m for m in moves if m != first]
+        return moves
+
+    def search_window(self, board, moves, depth, alpha, beta):
+        """
+        在 (alpha, beta) 窗口内对根节点做主要变例搜索（PVS）：第一个走法用完整窗口，
+        其余走法先用零窗口证明不优于当前最佳，证明失败才用完整窗口重搜。返回 (评分, 走法)
+        """
+        best_val = -INF
+        best_move = moves[0]
+        best_pv = []
+        for i, move in enumerate(moves):
+            new_board = self.make_move(board, move)
+            lower = max(alpha, best_val)
+            if i == 0:
+                val = self.min_value(new_board, depth - 1, lower, beta)
+            else:
+                val = self.min_value(new_board, depth - 1, lower, math.nextafter(lower, INF))
+                if lower < val < beta:
+                    val = self.min_value(new_board, depth - 1, lower, beta)
+            self.unmake_move(move)
             if val > best_val:
                 best_val = val
                 best_move = move
-        return best_move
+                best_pv = self.pv_table.get(depth - 1, [])
+            if best_val >= beta:
+                break
+        self.pv_table[depth - 1] = best_pv
+        return best_val, best_move
+
+    def record_root(self, score, pv):
+        self.prev_pv = pv
+        score = float(score)
+        self.last_info["score"] = int(score) if score.is_integer() else round(score, 2)
+        self.last_info["pv"] = pv
+
+    def check_time(self):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout
 
     def max_value(self, board, depth, alpha, beta):
+        self.pv_table[depth] = []
+        if depth == 0 and self.quiescence:
+            return self.quiesce_max(board, self.quiescence, alpha, beta)
+        self.check_time()
         if depth == 0 or self.terminal(board):
             return self.evaluate(board)
-        value = -float('inf')
-        moves = get_all_moves(board, self.player_id)
+        moves = self.ordered_moves(board, self.player_id, depth)
         if not moves:
             return self.evaluate(board)
-        for move in moves:
-            new_board = self.simulate_move(board, move)
-            value = max(value, self.min_value(new_board, depth - 1, alpha, beta))
+        if depth == 1 and self.leaf_batch is not None:
+            values = self.leaf_batch.evaluate_children(board, moves)
+            best = int(np.argmax(values))
+            self.pv_table[depth] = [moves[best]]
+            return float(values[best])
+        value = -INF
+        for i, move in enumerate(moves):
+            new_board = self.make_move(board, move)
+            if i == 0:
+                val = self.min_value(new_board, depth - 1, alpha, beta)
+            else:
+                # 零窗口 (alpha, alpha⁺)：只判断该走法能否超过 alpha
+                val = self.min_value(new_board, depth - 1, alpha, math.nextafter(alpha, INF))
+                if alpha < val < beta:
+                    val = self.min_value(new_board, depth - 1, alpha, beta)
+            self.unmake_move(move)
+            if val > value:
+                value = val
+                self.pv_table[depth] = [move] + self.pv_table[depth - 1]
             if value >= beta:
                 return value
             alpha = max(alpha, value)
         return value
 
     def min_value(self, board, depth, alpha, beta):
-        # 为简化起见，固定选择一个对手（例如：如果自己不是 1 则对手用 1，否则用 2）
-        opp = 1 if self.player_id != 1 else 2
+        # 为简化起见，固定以行棋顺序中的下一位玩家作为对手（两人对战时即为另一方）
+        opp = self.geometry.next_player(self.player_id)
+        self.pv_table[depth] = []
+        if depth == 0 and self.quiescence:
+            return self.quiesce_min(board, self.quiescence, alpha, beta)
+        self.check_time()
         if depth == 0 or self.terminal(board):
             return self.evaluate(board)
-        value = float('inf')
-        moves = get_all_moves(board, opp)
+        moves = self.ordered_moves(board, opp, depth)
         if not moves:
             return self.evaluate(board)
-        for move in moves:
-            new_board = self.simulate_move(board, move)
-            value = min(value, self.max_value(new_board, depth - 1, alpha, beta))
+        if depth == 1 and self.leaf_batch is not None:
+            values = self.leaf_batch.evaluate_children(board, moves)
+            best = int(np.argmin(values))
+            self.pv_table[depth] = [moves[best]]
+            return float(values[best])
+        value = INF
+        for i, move in enumerate(moves):
+            new_board = self.make_move(board, move)
+            if i == 0:
+                val = self.max_value(new_board, depth - 1, alpha, beta)
+            else:
+                # 零窗口 (beta⁻, beta)：只判断该走法能否低于 beta
+                val = self.max_value(new_board, depth - 1, math.nextafter(beta, -INF), beta)
+                if alpha < val < beta:
+                    val = self.max_value(new_board, depth - 1, alpha, beta)
+            self.unmake_move(move)
+            if val < value:
+                value = val
+                self.pv_table[depth] = [move] + self.pv_table[depth - 1]
+            if value <= alpha:
+                return value
+            beta = min(beta, value)
+        return value
+
+    def ordered_moves(self, board, player_id, depth=None):
+        """
+        按本步缩短的目标距离从大到小排序，先搜索前进最多的走法以提高剪枝效率；
+        给定剩余深度时，上一轮主要变例在同一层的走法排在最前
+        """
+        moves = get_all_moves(board, player_id, geometry=self.geometry, pieces=self.player_pieces(player_id))
+        distance = self.geometry.target_distance[player_id]
+        moves.sort(key=lambda m: distance[m[1]] - distance[m[0]])
+        ply = self.root_depth - depth if depth is not None else -1
+        if 0 <= ply < len(self.prev_pv):
+            pv_move = self.prev_pv[ply]
+            if pv_move in moves:
+                moves.remove(pv_move)
+                moves.insert(0, pv_move)
+        return moves
+
+    def forward_jumps(self, board, player_id):
+        """player_id 的所有缩短自身目标距离的跳跃走法，按缩短量从大到小排序"""
+        distance = self.geometry.target_distance[player_id]
+        jumps = [(distance[to_pos] - distance[from_pos], (from_pos, to_pos))
+                 for from_pos, to_pos in get_all_jump_moves(board, player_id, self.geometry,
+                                                            pieces=self.player_pieces(player_id))
+                 if distance[to_pos] < distance[from_pos]]
+        jumps.sort(key=lambda item: item[0])
+        return [move for _, move in jumps]
+
+    def quiesce_max(self, board, depth, alpha, beta):
+        """
+        静态搜索（本方走）：以当前评估为下限（本方可以不跳），只展开向前的跳跃，
+        避免在一串连跳即将发生时截断搜索（地平线效应）
+        """
+        self.check_time()
+        value = self.evaluate(board)
+        if depth == 0 or value >= beta or self.terminal(board):
+            return value
+        alpha = max(alpha, value)
+        for move in self.forward_jumps(board, self.player_id):
+            new_board = self.make_move(board, move)
+            value = max(value, self.quiesce_min(new_board, depth - 1, alpha, beta))
+            self.unmake_move(move)
+            if value >= beta:
+                return value
+            alpha = max(alpha, value)
+        return value
+
+    def quiesce_min(self, board, depth, alpha, beta):
+        """静态搜索（对手走）：对手同样可以不跳，只展开其向前的跳跃（可能挡住或拆掉本方的跳板）"""
+        self.check_time()
+        value = self.evaluate(board)
+        if depth == 0 or value <= alpha or self.terminal(board):
+            return value
+        beta = min(beta, value)
+        for move in self.forward_jumps(board, self.geometry.next_player(self.player_id)):
+            new_board = self.make_move(board, move)
+            value = min(value, self.quiesce_max(new_board, depth - 1, alpha, beta))
+            self.unmake_move(move)
             if value <= alpha:
                 return value
             beta = min(beta, value)
@@ -65,22 +334,48 @@ class MinimaxAI:
         new_board[from_pos] = 0
         return new_board
 
+    def make_move(self, board, move):
+        """搜索中走子：返回走完后的新棋盘，并同步更新棋子列表；返回上层前须调用 unmake_move"""
+        new_board = self.simulate_move(board, move)
+        if self.pieces is not None:
+            mover = int(new_board[move[1]])
+            self.pieces[mover].move(*move)
+            self.movers.append(mover)
+        return new_board
+
+    def unmake_move(self, move):
+        """撤销最近一次 make_move 对棋子列表的更新（棋盘本身是副本，无需撤销）"""
+        if self.pieces is not None:
+            self.pieces[self.movers.pop()].move(move[1], move[0])
+
+    def player_pieces(self, player_id):
+        """搜索中 player_id 的棋子列表；不在搜索中时返回 None（由调用方扫描棋盘）"""
+        return self.pieces[player_id] if self.pieces is not None else None
+
     def evaluate(self, board):
-        if self.player_id == 1:
-            my_target = (11, 11)
-        elif self.player_id == 2:
-            my_target = (0, 0)
-        elif self.player_id == 3:
-            my_target = (0, 11)
-        elif self.player_id == 4:
-            my_target = (11, 0)
-        my_pieces = np.argwhere(board == self.player_id)
-        my_distance = sum([abs(p[0] - my_target[0]) + abs(p[1] - my_target[1]) for p in my_pieces])
+        if self.eval_cache is None:
+            return self.compute_evaluation(board)
+        if self.evaluator is not None:
+            # 不同评估器的评分不可混用：按权重摘要区分，同一权重的评估器仍可共享缓存
+            kind = ("evaluator", getattr(self.evaluator, "cache_tag", id(self.evaluator)))
+        else:
+            kind = "distance"
+        key = (kind, self.geometry.key, self.player_id, position_key(board))
+        return self.eval_cache.lookup(key, lambda: self.compute_evaluation(board))
+
+    def compute_evaluation(self, board):
+        if self.evaluator is not None:
+            return self.evaluator.evaluate(board)
+        # 本方所有棋子到最深目标格的距离之和（查预计算的距离表）；搜索中直接遍历棋子列表
+        if self.pieces is not None:
+            return -self.pieces[self.player_id].distance_sum(self.geometry.target_distance_flat[self.player_id])
+        distance = self.geometry.target_distance[self.player_id]
+        my_distance = int(distance[board == self.player_id].sum())
         return -my_distance
 
     def terminal(self, board):
-        p1_done = np.count_nonzero(board[9:12, 9:12] == 1) == 9
-        p2_done = np.count_nonzero(board[9:12, 0:3] == 2) == 9
-        p3_done = np.count_nonzero(board[0:3, 9:12] == 3) == 9
-        p4_done = np.count_nonzero(board[0:3, 0:3] == 4) == 9
-        return p1_done or p2_done or p3_done or p4_done
+        # 与 Board.is_game_over 共用预计算的目标掩码判定
+        if self.eval_cache is None:
+            return target_status(board, self.geometry)[1]
+        key = ("terminal", self.geometry.key, position_key(board))
+        return self.eval_cache.lookup(key, lambda: target_status(board, self.geometry)[1])
@@ -1,37 +1,34 @@
 # ai/move_utils.py
 import numpy as np
 
-def get_valid_moves(pos, board):
-    x, y = pos
-    moves = []
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dx, dy in directions:
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < board.shape[0] and 0 <= ny < board.shape[1] and board[nx, ny] == 0:
-            moves.append((nx, ny))
-    return moves
+from geometry import geometry_for
 
-def get_jump_moves(pos, board):
-    x, y = pos
-    moves = []
-    directions = [(-1, -1), (-1, 0), (-1, 1),
-                  (0, -1),           (0, 1),
-                  (1, -1),  (1, 0),  (1, 1)]
-    for dx, dy in directions:
-        midx, midy = x + dx, y + dy
-        landingx, landingy = x + 2 * dx, y + 2 * dy
-        if (0 <= midx < board.shape[0] and 0 <= midy < board.shape[1] and board[midx, midy] != 0):
-            if (0 <= landingx < board.shape[0] and 0 <= landingy < board.shape[1] and board[landingx, landingy] == 0):
-                moves.append((landingx, landingy))
-    return moves
+def get_valid_moves(pos, board, geometry=None):
+    geometry = geometry or geometry_for(board)
+    return [n for n in geometry.steps[pos] if board[n] == 0]
+
+def get_jump_moves(pos, board, geometry=None):
+    # 中间格必须有棋子（> 0，不可用格子为 -1），落点必须为空
+    geometry = geometry or geometry_for(board)
+    return [land for mid, land in geometry.jumps[pos] if board[mid] > 0 and board[land] == 0]
+
+def player_positions(board, player_id):
+    """扫描棋盘得到 player_id 的所有棋子位置（行优先顺序的 (行, 列) 元组）"""
+    return [tuple(pos) for pos in np.argwhere(board == player_id).tolist()]
 
-def get_all_moves(board, player_id, as_move_tuple=True):
+
+def get_all_moves(board, player_id, as_move_tuple=True, geometry=None, pieces=None):
+    """
+    player_id 的所有走法。pieces 为该玩家的棋子列表（board.PieceList，与 board 同步），
+    给定时直接遍历棋子，不必扫描整个棋盘
+    """
+    geometry = geometry or geometry_for(board)
+    steps = geometry.steps
+    jumps = geometry.jumps
     moves = []
-    positions = np.argwhere(board == player_id)
-    for pos in positions:
-        pos = tuple(pos)
-        valid = get_valid_moves(pos, board)
-        jump = get_jump_moves(pos, board)
+    for pos in pieces if pieces is not None else player_positions(board, player_id):
+        valid = [n for n in steps[pos] if board[n] == 0]
+        jump = [land for mid, land in jumps[pos] if board[mid] > 0 and board[land] == 0]
         if as_move_tuple:
             moves.extend([(pos, m) for m in valid])
             moves.extend([(pos, m) for m in jump])
@@ -41,6 +38,44 @@ def get_all_moves(board, player_id, as_move_tuple=True):
     return moves
 
 
+def get_all_jump_moves(board, player_id, geometry=None, pieces=None):
+    """player_id 所有棋子的跳跃走法（不含相邻一步的走法），供静态搜索使用；pieces 同 get_all_moves"""
+    geometry = geometry or geometry_for(board)
+    jumps = geometry.jumps
+    moves = []
+    for pos in pieces if pieces is not None else player_positions(board, player_id):
+        moves.extend((pos, land) for mid, land in jumps[pos] if board[mid] > 0 and board[land] == 0)
+    return moves
+
+
+_PAD = 2
+
+
+def get_moves_array(board, positions, geometry=None):
+    """
+    一次 NumPy 运算生成 positions 中所有棋子的走法。
+    返回 (src, dst, piece)：src、dst 为 (k, 2) 的整数数组，piece 为每步走法所属棋子
+    在 positions 中的下标；走法顺序与按 positions 顺序逐个调用
+    get_valid_moves + get_jump_moves 完全一致。
+    """
+    geometry = geometry or geometry_for(board)
+    positions = np.asarray(positions, dtype=int).reshape(-1, 2)
+    # 四周各填充 2 圈 -1：越界或不可用的落点不为 0 被排除，中间格要求 > 0
+    rows, cols = board.shape
+    padded = np.full((rows + 2 * _PAD, cols + 2 * _PAD), -1, dtype=board.dtype)
+    padded[_PAD:-_PAD, _PAD:-_PAD] = board
+    base = positions[:, None, :] + _PAD
+    dest = base + geometry.move_offsets
+    mid = base + geometry.mid_offsets
+    dest_empty = padded[dest[..., 0], dest[..., 1]] == 0
+    mid_occupied = padded[mid[..., 0], mid[..., 1]] > 0
+    valid = dest_empty & (mid_occupied | ~geometry.is_jump)
+    piece_idx, dir_idx = np.nonzero(valid)
+    src = positions[piece_idx]
+    dst = src + geometry.move_offsets[dir_idx]
+    return src, dst, piece_idx
+
+
 def get_continuous_jump_moves(pos, board, visited=None, max_depth=3):
     """
     实现连续跳跃（包括相邻跳与等距跳）的搜索，增加了一个 max_depth 限制连续跳跃的最大次数，
@@ -86,82 +121,25 @@ def get_continuous_jump_moves(pos, board, visited=None, max_depth=3):
      
     
 
-def free_up_target_entry(board, player_id):
+def free_up_target_entry(board, player_id, geometry=None):
     """
     当目标区域几乎填满，导致最后一个棋子无法进入时，
-    尝试腾出目标入口位置，方法是将目标区域内处于入口边界的棋子向内部移动。
-    
-    四个玩家的目标区域和入口条件：
-    - 玩家 1（目标：右下区域，即 row >= 9 且 col >= 9）：若棋子处于 row==9 或 col==9，
-      尝试移动到 (row+1, col)、(row, col+1) 或 (row+1, col+1) 中空的单元。
-    - 玩家 2（目标：左下区域，即 row >= 9 且 col < 3）：若棋子处于 row==9 或 col==2，
-      尝试移动到 (row+1, col)、(row, col-1) 或 (row+1, col-1) 中空的单元。
-    - 玩家 3（目标：右上区域，即 row < 3 且 col >= 9）：若棋子处于 row==2 或 col==9，
-      尝试移动到 (row-1, col)、(row, col+1) 或 (row-1, col+1) 中空的单元。
-    - 玩家 4（目标：左上区域，即 row < 3 且 col < 3）：若棋子处于 row==2 或 col==2，
-      尝试移动到 (row-1, col)、(row, col-1) 或 (row-1, col-1) 中空的单元。
+    尝试腾出目标入口位置，方法是将目标区域内处于入口层（最外层）的棋子向内部移动。
+
+    依次检查本方处于入口层的棋子，若其相邻格中有
+    位于目标区域内、且离最深目标格更近的空位，则移动到其中最深的一个。
     """
-    if player_id == 1:
-        for row in range(9, 12):
-            for col in range(9, 12):
-                if board[row, col] == 1:
-                    if row == 9 or col == 9:
-                        candidates = []
-                        if row + 1 < 12 and board[row+1, col] == 0:
-                            candidates.append((row+1, col))
-                        if col + 1 < 12 and board[row, col+1] == 0:
-                            candidates.append((row, col+1))
-                        if row + 1 < 12 and col + 1 < 12 and board[row+1, col+1] == 0:
-                            candidates.append((row+1, col+1))
-                        if candidates:
-                            best_candidate = min(candidates, key=lambda pos: abs(pos[0]-11) + abs(pos[1]-11))
-                            return ((row, col), best_candidate)
-        return None
-    elif player_id == 2:
-        for row in range(9, 12):
-            for col in range(0, 3):
-                if board[row, col] == 2:
-                    if row == 9 or col == 2:
-                        candidates = []
-                        if row + 1 < 12 and board[row+1, col] == 0:
-                            candidates.append((row+1, col))
-                        if col - 1 >= 0 and board[row, col-1] == 0:
-                            candidates.append((row, col-1))
-                        if row + 1 < 12 and col - 1 >= 0 and board[row+1, col-1] == 0:
-                            candidates.append((row+1, col-1))
-                        if candidates:
-                            best_candidate = min(candidates, key=lambda pos: abs(pos[0]-11) + abs(pos[1]-0))
-                            return ((row, col), best_candidate)
-        return None
-    elif player_id == 3:
-        for row in range(0, 3):
-            for col in range(9, 12):
-                if board[row, col] == 3:
-                    if row == 2 or col == 9:
-                        candidates = []
-                        if row - 1 >= 0 and board[row-1, col] == 0:
-                            candidates.append((row-1, col))
-                        if col + 1 < 12 and board[row, col+1] == 0:
-                            candidates.append((row, col+1))
-                        if row - 1 >= 0 and col + 1 < 12 and board[row-1, col+1] == 0:
-                            candidates.append((row-1, col+1))
-                        if candidates:
-                            best_candidate = min(candidates, key=lambda pos: abs(pos[0]-0) + abs(pos[1]-11))
-                            return ((row, col), best_candidate)
-        return None
-    elif player_id == 4:
-        for row in range(0, 3):
-            for col in range(0, 3):
-                if board[row, col] == 4:
-                    if row == 2 or col == 2:
-                        candidates = []
-                        if row - 1 >= 0 and board[row-1, col] == 0:
-                            candidates.append((row-1, col))
-                        if col - 1 >= 0 and board[row, col-1] == 0:
-                            candidates.append((row, col-1))
-                        if row - 1 >= 0 and col - 1 >= 0 and board[row-1, col-1] == 0:
-                            candidates.append((row-1, col-1))
-                        if candidates:
-                            best_candidate = min(candidates, key=lambda pos: abs(pos[0]-0) + abs(pos[1]-0))
-                            return ((row, col), best_candidate)
+    geometry = geometry or geometry_for(board)
+    if player_id not in geometry.target_masks:
         return None
+    target_mask = geometry.target_masks[player_id]
+    distance = geometry.target_distance[player_id]
+    for pos in geometry.entry_cells[player_id]:
+        if board[pos] != player_id:
+            continue
+        candidates = [n for n in geometry.steps[pos]
+                      if target_mask[n] and board[n] == 0 and distance[n] < distance[pos]]
+        if candidates:
+            best_candidate = min(candidates, key=lambda n: distance[n])
+            return (pos, best_candidate)
+    return None
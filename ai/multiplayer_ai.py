@@ -0,0 +1,219 @@
+# ai/multiplayer_ai.py
+"""
+多人（3-6 人）对局的搜索 AI，均沿用 MinimaxAI 的接口（choose_move / 迭代加深 / 截止时刻）：
+
+  MaxNAI       max-n：每个节点由当前行棋方最大化自己的分量，按行棋顺序轮流；
+               评估为常和向量，可做浅剪枝（shallow pruning）
+  ParanoidAI   paranoid：假设其余所有玩家联合对付自己，按行棋顺序轮流，alpha-beta 剪枝
+  BestReplyAI  best-reply search：对手层把所有对手的走法合并为一层，只让"最有威胁"的
+               一个对手走棋，同样深度下能看到更多自己的后续走法
+
+两人对局时三者均退化为普通的 minimax。
+"""
+import numpy as np
+from .minimax_ai import MinimaxAI
+from .move_utils import get_all_moves
+from .eval_cache import position_key
+
+# 几何 -> 每位玩家棋子到目标的最大可能总距离（常和评估的偏移量）
+_MAX_DISTANCE = {}
+
+
+def max_total_distance(geometry):
+    """每位玩家所有棋子到最深目标格的总距离上限（取棋盘上距离最大的若干格）"""
+    key = geometry.key
+    if key not in _MAX_DISTANCE:
+        bounds = {}
+        for p in geometry.players:
+            distances = np.sort(geometry.target_distance[p][geometry.valid])[::-1]
+            bounds[p] = int(distances[:len(geometry.start_cells[p])].sum())
+        _MAX_DISTANCE[key] = max(bounds.values())
+    return _MAX_DISTANCE[key]
+
+
+class MultiPlayerSearchAI(MinimaxAI):
+    """多人搜索的公共部分：按行棋顺序轮转、常和评估向量、走法排序"""
+
+    def __init__(self, player_id, depth=3, geometry=None, eval_cache=None):
+        # 主要变例搜索和渴望窗口只用于两方 minimax，多人搜索按原方式逐层搜索
+        super().__init__(player_id, depth, geometry, eval_cache, aspiration=None)
+
+    @property
+    def players(self):
+        return self.geometry.players
+
+    def evaluate_vector(self, board):
+        # 评估向量与视角无关，缓存中的结果可被所有多人搜索 AI 共用
+        if self.eval_cache is None:
+            return self.compute_vector(board)
+        key = ("vector", self.geometry.key, position_key(board))
+        return self.eval_cache.lookup(key, lambda: self.compute_vector(board))
+
+    def compute_vector(self, board):
+        """
+        每位玩家的评估分量（按 geometry.players 顺序）：
+        全体平均总距离 - 本方总距离 + D，D 为总距离上限。
+        各分量非负且总和恒为 D * 人数（常和），领先越多分量越大
+        """
+        if self.pieces is not None:
+            flat = self.geometry.target_distance_flat
+            distances = np.array([self.pieces[p].distance_sum(flat[p]) for p in self.players])
+        else:
+            distances = np.array([int(self.geometry.target_distance[p][board == p].sum())
+                                  for p in self.players])
+        offset = max_total_distance(self.geometry)
+        return distances.mean() - distances + offset
+
+    def max_sum(self):
+        """评估向量各分量之和（常和）"""
+        return max_total_distance(self.geometry) * self.geometry.num_players
+
+    def evaluate(self, board):
+        return float(self.evaluate_vector(board)[self.players.index(self.player_id)])
+
+
+class MaxNAI(MultiPlayerSearchAI):
+    def search_root(self, board, moves, depth):
+        me = self.players.index(self.player_id)
+        nxt = self.geometry.next_player(self.player_id)
+        best_val = -float('inf')
+        best_move = None
+        for move in moves:
+            new_board = self.make_move(board, move)
+            val = self.maxn(new_board, nxt, depth - 1, best_val)[me]
+            self.unmake_move(move)
+            if val > best_val:
+                best_val = val
+                best_move = move
+        return best_move
+
+    def maxn(self, board, player_id, depth, bound):
+        """
+        返回评估向量。bound 为父节点行棋方目前已得到的最好分量：
+        当本节点行棋方的分量已不小于 常和 - bound 时，父节点的分量不可能再超过 bound，
+        剩余走法无需搜索（浅剪枝）
+        """
+        self.check_time()
+        if depth == 0 or self.terminal(board):
+            return self.evaluate_vector(board)
+        nxt = self.geometry.next_player(player_id)
+        moves = self.ordered_moves(board, player_id)
+        if not moves:
+            # 无子可走时轮空
+            return self.maxn(board, nxt, depth - 1, -float('inf'))
+        me = self.players.index(player_id)
+        limit = self.max_sum() - bound
+        best = None
+        for move in moves:
+            new_board = self.make_move(board, move)
+            value = self.maxn(new_board, nxt, depth - 1, best[me] if best is not None else -float('inf'))
+            self.unmake_move(move)
+            if best is None or value[me] > best[me]:
+                best = value
+            if best[me] >= limit:
+                break
+        return best
+
+
+class ParanoidAI(MultiPlayerSearchAI):
+    def search_root(self, board, moves, depth):
+        nxt = self.geometry.next_player(self.player_id)
+        best_val = -float('inf')
+        best_move = None
+        for move in moves:
+            new_board = self.make_move(board, move)
+            val = self.paranoid(new_board, nxt, depth - 1, best_val, float('inf'))
+            self.unmake_move(move)
+            if val > best_val:
+                best_val = val
+                best_move = move
+        return best_move
+
+    def paranoid(self, board, player_id, depth, alpha, beta):
+        """本方取最大、其余玩家一律取最小，按行棋顺序轮转的 alpha-beta"""
+        self.check_time()
+        if depth == 0 or self.terminal(board):
+            return self.evaluate(board)
+        nxt = self.geometry.next_player(player_id)
+        moves = self.ordered_moves(board, player_id)
+        if not moves:
+            return self.paranoid(board, nxt, depth - 1, alpha, beta)
+        if player_id == self.player_id:
+            value = -float('inf')
+            for move in moves:
+                new_board = self.make_move(board, move)
+                value = max(value, self.paranoid(new_board, nxt, depth - 1, alpha, beta))
+                self.unmake_move(move)
+                if value >= beta:
+                    return value
+                alpha = max(alpha, value)
+        else:
+            value = float('inf')
+            for move in moves:
+                new_board = self.make_move(board, move)
+                value = min(value, self.paranoid(new_board, nxt, depth - 1, alpha, beta))
+                self.unmake_move(move)
+                if value <= alpha:
+                    return value
+                beta = min(beta, value)
+        return value
+
+
+class BestReplyAI(MultiPlayerSearchAI):
+    def search_root(self, board, moves, depth):
+        best_val = -float('inf')
+        best_move = None
+        for move in moves:
+            new_board = self.make_move(board, move)
+            val = self.min_value(new_board, depth - 1, best_val, float('inf'))
+            self.unmake_move(move)
+            if val > best_val:
+                best_val = val
+                best_move = move
+        return best_move
+
+    def opponent_moves(self, board):
+        """所有对手的全部走法合并为一层，按本步前进距离排序"""
+        moves = []
+        for p in self.players:
+            if p != self.player_id:
+                distance = self.geometry.target_distance[p]
+                moves.extend((distance[to_pos] - distance[from_pos], (from_pos, to_pos))
+                             for from_pos, to_pos in get_all_moves(board, p, geometry=self.geometry,
+                                                                   pieces=self.player_pieces(p)))
+        moves.sort(key=lambda item: item[0])
+        return [move for _, move in moves]
+
+    def max_value(self, board, depth, alpha, beta):
+        self.check_time()
+        if depth == 0 or self.terminal(board):
+            return self.evaluate(board)
+        moves = self.ordered_moves(board, self.player_id)
+        if not moves:
+            return self.min_value(board, depth - 1, alpha, beta)
+        value = -float('inf')
+        for move in moves:
+            new_board = self.make_move(board, move)
+            value = max(value, self.min_value(new_board, depth - 1, alpha, beta))
+            self.unmake_move(move)
+            if value >= beta:
+                return value
+            alpha = max(alpha, value)
+        return value
+
+    def min_value(self, board, depth, alpha, beta):
+        self.check_time()
+        if depth == 0 or self.terminal(board):
+            return self.evaluate(board)
+        moves = self.opponent_moves(board)
+        if not moves:
+            return self.max_value(board, depth - 1, alpha, beta)
+        value = float('inf')
+        for move in moves:
+            new_board = self.make_move(board, move)
+            value = min(value, self.max_value(new_board, depth - 1, alpha, beta))
+            self.unmake_move(move)
+            if value <= alpha:
+                return value
+            beta = min(beta, value)
+        return value
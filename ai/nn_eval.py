@@ -0,0 +1,214 @@
+# ai/nn_eval.py
+"""
+基于小型多层感知机（NumPy，仅 CPU）的局面评估器，可替代 MinimaxAI 的距离评估。
+
+输入特征为棋盘每个可用格的两个平面：本方棋子、其他玩家的棋子（共 2 * 格数维）；
+隐藏层使用 ReLU，输出一个标量（越大对本方越有利）。一批局面的评估只需几次矩阵乘法，
+配合 LeafBatch 把同一父节点下的全部叶子一次送入网络，避免逐个局面的 Python 开销。
+
+权重文件为 .npz：W0, b0, W1, b1, ...，以及 geometry（棋盘类型）、num_players、player_id。
+
+用法示例:
+  python -m ai.nn_eval --init distance --player 1 --out weights/square2_p1.npz
+  python -m ai.nn_eval --bench weights/square2_p1.npz
+"""
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from geometry import get_geometry
+
+
+class MLPEvaluator:
+    def __init__(self, layers, geometry, player_id):
+        """
+        参数:
+          layers: [(W, b), ...]，W 的形状为 (输入维数, 输出维数)，最后一层输出 1 维
+          geometry: 网络对应的棋盘几何
+          player_id: 网络评估的视角（本方玩家编号）
+        """
+        self.geometry = geometry
+        self.player_id = player_id
+        self.cell_index = np.flatnonzero(geometry.valid)
+        self.set_layers(layers)
+
+    def set_layers(self, layers):
+        """
+        设置权重并重新计算权重摘要 cache_tag（局面评估缓存据此区分不同评估器的结果）。
+        就地修改权重（from_distance、训练）之后须调用 set_layers(self.layers)，否则缓存键过时
+        """
+        self.layers = [(np.asarray(W, dtype=np.float32), np.asarray(b, dtype=np.float32)) for W, b in layers]
+        expected = 2 * len(self.cell_index)
+        if self.layers[0][0].shape[0] != expected or self.layers[-1][0].shape[1] != 1:
+            raise ValueError(f"网络形状与 {self.geometry} 不符：输入应为 {expected} 维、输出应为 1 维")
+        digest = hashlib.sha1(repr((self.geometry.key, self.player_id)).encode())
+        for W, b in self.layers:
+            digest.update(W.tobytes())
+            digest.update(b.tobytes())
+        self.cache_tag = digest.hexdigest()
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        geometry = get_geometry(str(data["geometry"]), int(data["num_players"]))
+        layers = []
+        while f"W{len(layers)}" in data:
+            i = len(layers)
+            layers.append((data[f"W{i}"], data[f"b{i}"]))
+        return cls(layers, geometry, int(data["player_id"]))
+
+    def save(self, path):
+        arrays = {}
+        for i, (W, b) in enumerate(self.layers):
+            arrays[f"W{i}"] = W
+            arrays[f"b{i}"] = b
+        name, num_players = self.geometry.key
+        np.savez(path, geometry=name, num_players=num_players, player_id=self.player_id, **arrays)
+
+    @classmethod
+    def random(cls, geometry, player_id, hidden=(64,), seed=None):
+        """随机初始化（He 初始化），供训练起步使用"""
+        rng = np.random.default_rng(seed)
+        sizes = [2 * len(geometry.cells), *hidden, 1]
+        layers = [(rng.normal(0, np.sqrt(2 / n_in), (n_in, n_out)), np.zeros(n_out))
+                  for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+        return cls(layers, geometry, player_id)
+
+    @classmethod
+    def from_distance(cls, geometry, player_id, hidden=(64,), seed=None):
+        """
+        构造一个与 MinimaxAI 距离评估完全等价的网络：第一个隐藏单元累加
+        (最大距离 - 距离)，经 ReLU 原样传到输出；其余隐藏单元保留随机权重，
+        但不连到输出，便于在此基础上继续训练。也用于验证批量评估的正确性
+        """
+        net = cls.random(geometry, player_id, hidden, seed)
+        distance = geometry.target_distance[player_id].ravel()[net.cell_index].astype(np.float32)
+        max_distance = distance.max()
+        pieces = len(geometry.start_cells[player_id])
+        n = len(net.cell_index)
+        last = len(net.layers) - 1
+        for i, (W, b) in enumerate(net.layers):
+            if i == last:
+                W[:] = 0
+                b[:] = 0
+            else:
+                # 第 0 号单元只接收上一层的第 0 号单元（或输入），也只连到下一层的第 0 号单元
+                W[:, 0] = 0
+                b[0] = 0
+            if i + 1 < len(net.layers):
+                net.layers[i + 1][0][0, :] = 0
+            if i == 0:
+                W[:n, 0] = max_distance - distance
+            else:
+                W[0, 0] = 1
+        # 输出 = sum(最大距离 - 距离) - 最大距离 * 棋子数 = -总距离
+        net.layers[-1][1][0] = -max_distance * pieces
+        net.set_layers(net.layers)
+        return net
+
+    def features(self, boards):
+        """(批量, 行, 列) 的棋盘 -> (批量, 2 * 格数) 的 float32 特征"""
+        return self.cell_features(boards.reshape(len(boards), -1)[:, self.cell_index])
+
+    def cell_features(self, cells):
+        """(批量, 格数) 的可用格取值（按 geometry.cells 顺序）-> 特征"""
+        own = cells == self.player_id
+        others = (cells > 0) & ~own
+        return np.concatenate([own, others], axis=1).astype(np.float32)
+
+    def evaluate_batch(self, boards):
+        """一次评估一批局面，返回形状为 (批量,) 的评估值"""
+        return self.evaluate_features(self.features(boards))
+
+    def evaluate_features(self, x):
+        x = x.astype(np.float32, copy=False)
+        for W, b in self.layers[:-1]:
+            x = x @ W
+            x += b
+            np.maximum(x, 0, out=x)
+        W, b = self.layers[-1]
+        return (x @ W + b)[:, 0]
+
+    def evaluate(self, board):
+        return float(self.evaluate_batch(board[None])[0])
+
+
+def child_boards(board, moves):
+    """board 分别走完每个 moves 后的子局面，形状为 (走法数, 行, 列)"""
+    children = np.repeat(board[None], len(moves), axis=0)
+    idx = np.arange(len(moves))
+    moves = np.asarray(moves)
+    src_r, src_c, dst_r, dst_c = moves[:, 0, 0], moves[:, 0, 1], moves[:, 1, 0], moves[:, 1, 1]
+    children[idx, dst_r, dst_c] = children[idx, src_r, src_c]
+    children[idx, src_r, src_c] = 0
+    return children
+
+
+class LeafBatch:
+    """
+    叶子批量评估：把同一父节点下的全部子局面按走法向量化生成（不逐个复制棋盘），一次送入评估器。
+    批量不跨父节点——alpha-beta 要先得到本节点的值才能决定是否剪去其余兄弟节点
+    """
+
+    def __init__(self, evaluator, max_batch=4096):
+        self.evaluator = evaluator
+        # 单次前向的最大局面数，子局面更多时分块评估
+        self.max_batch = max_batch
+        self.batches = 0
+        self.positions = 0
+
+    def evaluate_children(self, board, moves):
+        """board 分别走完每个 moves 后的子局面的评估值数组"""
+        children = child_boards(board, moves)
+        values = np.concatenate([self.evaluator.evaluate_batch(children[i:i + self.max_batch])
+                                 for i in range(0, len(children), self.max_batch)])
+        self.batches += 1
+        self.positions += len(children)
+        return values
+
+
+def load_evaluator(evaluator):
+    """AI 构造参数 evaluator 的取值：权重文件路径或已创建的评估器"""
+    if isinstance(evaluator, str):
+        return MLPEvaluator.load(evaluator)
+    return evaluator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NumPy MLP 局面评估器：生成初始权重 / 吞吐基准")
+    parser.add_argument("--init", choices=["distance", "random"], help="生成初始权重")
+    parser.add_argument("--geometry", default="square")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--player", type=int, default=1)
+    parser.add_argument("--hidden", type=int, nargs="*", default=[64])
+    parser.add_argument("--out", help="权重输出路径")
+    parser.add_argument("--bench", help="对权重文件做逐个/批量评估的吞吐对比")
+    args = parser.parse_args(argv)
+
+    if args.init:
+        geometry = get_geometry(args.geometry, args.players)
+        make = MLPEvaluator.from_distance if args.init == "distance" else MLPEvaluator.random
+        make(geometry, args.player, tuple(args.hidden)).save(args.out)
+        print(f"已保存 {args.out}")
+    if args.bench:
+        from board import Board
+        from ai.move_utils import get_all_moves
+        net = MLPEvaluator.load(args.bench)
+        board = Board(net.geometry).board
+        moves = get_all_moves(board, net.player_id)
+        boards = np.concatenate([child_boards(board, moves)] * 20)
+        start = time.perf_counter()
+        for b in boards:
+            net.evaluate(b)
+        single = len(boards) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        net.evaluate_batch(boards)
+        batched = len(boards) / (time.perf_counter() - start)
+        print(f"逐个评估 {single:,.0f} 局面/秒，批量评估 {batched:,.0f} 局面/秒（批量 {len(boards)}）")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+# ai/ponder.py
+"""
+后台预测搜索（pondering）：在对手思考期间，提前搜索对手最可能的应着之后的局面。
+
+PonderingAI 包装一个按名称创建的搜索 AI（默认 Minimax）。每次走完一步后，取本方搜索的
+主要变例中对手的应着及按前进距离排序的其余应着，共 replies 个，交给独立的工作进程依次搜索。
+轮到本方时：
+  - 命中（实际局面是预测之一）：已搜完则直接使用结果；仍在搜索则让工作进程专注于该局面，
+    等到本步截止时刻前再让它停止，取最近一次完整迭代的结果。相当于把对手的思考时间也用上了
+  - 未命中：通知工作进程停止（搜索在下一个节点即结束），按正常方式搜索
+
+搜索放在单独的进程而非线程中：同一进程内的对手 AI 与预测搜索会争用 GIL，线程并不能增加可用的计算量。
+工作进程按 (名称, 玩家, 参数) 缓存 AI 实例，跨步复用。预测搜索与正常搜索同深度，
+不计时的对局中命中时的走法与不预测时完全相同。
+"""
+import multiprocessing
+import time
+import traceback
+
+from geometry import geometry_for
+from .move_utils import get_all_moves
+from .registry import cached_ai, create_ai
+
+# 命中时预留给进程间通信的时间（秒）：在截止时刻前这么久让工作进程停止
+PONDER_MARGIN = 0.05
+
+# 工作进程内的状态：当前任务编号、专注的预测序号与结果队列
+_CURRENT = None
+_FOCUS = None
+_RESULTS = None
+
+
+def _worker_loop(jobs, current, focus, results):
+    """工作进程主循环：逐个执行 jobs 中的预测任务，收到 None 时退出"""
+    global _CURRENT, _FOCUS, _RESULTS
+    _CURRENT, _FOCUS, _RESULTS = current, focus, results
+    for job in iter(jobs.get, None):
+        try:
+            ponder_search(*job)
+        except Exception:
+            # 单个任务出错（如 AI 参数无效）不结束工作进程，主进程已从结束标记得知该任务没有结果
+            traceback.print_exc()
+
+
+class _StopFlag:
+    """第 index 个预测的停止信号：任务被取消或主进程已转而专注于其他预测时置位"""
+
+    def __init__(self, job_id, index):
+        self.job_id = job_id
+        self.index = index
+
+    def is_set(self):
+        focus = _FOCUS.value
+        return _CURRENT.value != self.job_id or (focus >= 0 and focus != self.index)
+
+
+def ponder_search(name, player_id, options, boards, job_id):
+    """
+    在工作进程中依次搜索 boards，每搜完一个即把 (任务编号, 序号, 走法, 搜索信息) 放入结果队列；
+    结束时放入 (任务编号, None, None, None)，主进程据此知道不会再有结果
+    """
+    try:
+        ai = cached_ai(name, player_id, options)
+        for index, board in enumerate(boards):
+            if _CURRENT.value != job_id:
+                return
+            focus = _FOCUS.value
+            if focus >= 0 and focus != index:
+                continue
+            ai.stop_event = _StopFlag(job_id, index)
+            try:
+                # 截止时刻为无穷远：只由停止信号结束，结束时返回最近一次完整迭代的结果
+                move = ai.choose_move(board, deadline=float("inf"))
+            finally:
+                ai.stop_event = None
+            _RESULTS.put((job_id, index, move, dict(getattr(ai, "last_info", None) or {})))
+    finally:
+        _RESULTS.put((job_id, None, None, None))
+
+
+class PonderingAI:
+    def __init__(self, player_id, base="Minimax", replies=1, **options):
+        """
+        参数:
+          base: 被包装的 AI 名称（见 ai/registry.py），options 透传给它的构造函数
+          replies: 预测的对手应着个数
+        """
+        self.player_id = player_id
+        self.base = base
+        self.options = options
+        self.replies = replies
+        self.ai = create_ai(base, player_id, **options)
+        self.last_info = {}
+        self.hits = 0
+        self.misses = 0
+        self.process = None
+        self.predictions = []
+        self.job_id = 0
+
+    @property
+    def display_name(self):
+        return f"{getattr(self.ai, 'display_name', self.ai.__class__.__name__)}[预测]"
+
+    def reseed(self, seed):
+        if hasattr(self.ai, "reseed"):
+            self.ai.reseed(seed)
+
+    def start(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        context = multiprocessing.get_context()
+        self._current = context.RawValue("q", 0)
+        self._focus = context.RawValue("q", -1)
+        self._jobs = context.SimpleQueue()
+        self._results = context.SimpleQueue()
+        # 守护进程：主进程退出时直接结束，不等待进行中的预测搜索
+        self.process = context.Process(target=_worker_loop, daemon=True,
+                                       args=(self._jobs, self._current, self._focus, self._results))
+        self.process.start()
+
+    def choose_move(self, board, deadline=None):
+        move = self.ponder_hit(board, deadline)
+        if move is None:
+            move = self.ai.choose_move(board, deadline=deadline)
+            self.last_info = dict(getattr(self.ai, "last_info", None) or {})
+        if move is not None:
+            after = board.copy()
+            after[move[1]] = after[move[0]]
+            after[move[0]] = 0
+            self.ponder(after)
+        return move
+
+    def predict(self, board):
+        """对手在 board 上最可能的 replies 个应着：先取本方主要变例中的应着，再按前进距离补足"""
+        geometry = geometry_for(board)
+        opponent = geometry.next_player(self.player_id)
+        legal = get_all_moves(board, opponent, geometry=geometry)
+        distance = geometry.target_distance[opponent]
+        legal.sort(key=lambda m: distance[m[1]] - distance[m[0]])
+        pv = self.last_info.get("pv") or []
+        if len(pv) > 1 and pv[1] in legal:
+            legal.remove(pv[1])
+            legal.insert(0, pv[1])
+        return legal[:self.replies]
+
+    def ponder(self, board):
+        """取消上一轮预测，开始在后台搜索 board 上对手各预测应着之后的局面"""
+        self.cancel()
+        boards = []
+        for from_pos, to_pos in self.predict(board):
+            reply = board.copy()
+            reply[to_pos] = reply[from_pos]
+            reply[from_pos] = 0
+            boards.append(reply)
+        if not boards:
+            return
+        self.start()
+        # 丢弃已取消任务留下的结果，以免结果管道被写满
+        while not self._results.empty():
+            self._results.get()
+        self.job_id += 1
+        self._focus.value = -1
+        self._current.value = self.job_id
+        self.predictions = [b.tobytes() for b in boards]
+        self._jobs.put((self.base, self.player_id, self.options, boards, self.job_id))
+
+    def cancel(self):
+        """让工作进程停止当前的预测搜索（不等待）"""
+        if self.process is not None:
+            self._current.value = 0
+        self.predictions = []
+
+    def ponder_hit(self, board, deadline):
+        """实际局面命中预测时返回预测搜索的走法，否则取消预测并返回 None"""
+        key = board.tobytes()
+        if key not in self.predictions:
+            if self.predictions:
+                self.misses += 1
+            self.cancel()
+            return None
+        index = self.predictions.index(key)
+        self._focus.value = index
+        result = self.wait_result(index, deadline)
+        self.cancel()
+        if result is None:
+            return None
+        self.hits += 1
+        move, info = result
+        self.last_info = dict(info, ponder="hit")
+        return move
+
+    def wait_result(self, index, deadline):
+        """
+        等待第 index 个预测的结果；到截止时刻前 PONDER_MARGIN 秒仍未搜完则让它停止，取已完成的迭代。
+        任务没有给出该结果就结束（或工作进程异常退出）时返回 None
+        """
+        stop_at = None if deadline is None else deadline - PONDER_MARGIN
+        while True:
+            if self._results.empty():
+                if not self.process.is_alive():
+                    return None
+                if stop_at is not None and time.perf_counter() >= stop_at:
+                    self._current.value = 0
+                    stop_at = None
+                # SimpleQueue 不支持超时，轮询等待；只在命中时等待，开销可忽略
+                time.sleep(0.001)
+                continue
+            job_id, i, move, info = self._results.get()
+            if job_id != self.job_id:
+                continue
+            if i is None:
+                return None
+            if i == index:
+                return move, info
+
+    def close(self):
+        self.cancel()
+        if self.process is not None:
+            self._jobs.put(None)
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
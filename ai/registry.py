@@ -0,0 +1,61 @@
+# ai/registry.py
+"""
+按名称创建 AI 实例，供界面、子进程引擎等按字符串配置 AI 的场景使用。
+
+各 AI 的共同约定：
+  - 构造参数 player_id 为本方玩家编号；geometry 仅为初始值，choose_move 时按传入的棋盘重新确定
+  - choose_move(board, deadline=None)：deadline 为 time.perf_counter() 时间轴上的截止时刻；
+    单步计算量很小的 AI（Greedy、AStar）只为接口统一而接受，不检查
+  - 带随机性的 AI 持有独立的 random.Random 并提供 reseed(seed)，Game 每步按本步种子重设
+"""
+import importlib
+
+# 名称 -> (模块, 类名)；按需导入，避免未使用的 AI 拖慢启动
+AI_TYPES = {
+    "Greedy": ("ai.greedy_ai", "GreedyAI"),
+    "Minimax": ("ai.minimax_ai", "MinimaxAI"),
+    "AStar": ("ai.astar_ai", "AStarAI"),
+    "MaxN": ("ai.multiplayer_ai", "MaxNAI"),
+    "Paranoid": ("ai.multiplayer_ai", "ParanoidAI"),
+    "BestReply": ("ai.multiplayer_ai", "BestReplyAI"),
+    # 包装其他 AI（默认 Minimax），在对手思考期间后台搜索预测的应着
+    "Ponder": ("ai.ponder", "PonderingAI"),
+}
+
+
+def get_ai_class(name):
+    if name not in AI_TYPES:
+        raise ValueError(f"未知的 AI 类型：{name}（可选：{', '.join(AI_TYPES)}）")
+    module_name, class_name = AI_TYPES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_ai(name, player_id, **kwargs):
+    """创建名为 name 的 AI，kwargs 透传给构造函数（如 Minimax 的 depth）"""
+    return get_ai_class(name)(player_id, **kwargs)
+
+
+# 本进程中按配置缓存的 AI 实例（进程池的工作进程据此跨任务复用 AI 及其内部缓存）
+_CACHED_AIS = {}
+# 缓存的实例数上限，超过时丢弃最早创建的
+MAX_CACHED_AIS = 64
+
+
+def _option_key(value):
+    """参数值在缓存键中的写法：带 cache_tag 的对象（如 nn_eval.MLPEvaluator）按权重摘要，其余按 repr"""
+    tag = getattr(value, "cache_tag", None)
+    return ("cache_tag", tag) if tag is not None else repr(value)
+
+
+def cached_ai(name, player_id, options):
+    """
+    返回本进程中按 (名称, 玩家编号, 参数) 缓存的 AI，没有时创建。
+    参数可以是任意对象；repr 不反映取值的对象（如含内存地址）每次得到新的键，只是不复用，不会混用
+    """
+    key = (name, player_id, tuple(sorted((k, _option_key(v)) for k, v in options.items())))
+    ai = _CACHED_AIS.get(key)
+    if ai is None:
+        if len(_CACHED_AIS) >= MAX_CACHED_AIS:
+            _CACHED_AIS.pop(next(iter(_CACHED_AIS)))
+        ai = _CACHED_AIS[key] = create_ai(name, player_id, **options)
+    return ai
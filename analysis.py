@@ -0,0 +1,208 @@
+"""
+对局分析：用参考 AI（默认 Minimax depth=4）重新搜索对局记录中的每个局面，统计实际走法相对参考走法的
+评分损失和一致率，用于找出失误，以及衡量快速设置与深层搜索的差距。
+
+局面在进程池中并行搜索。结果按 (参考 AI, 玩家, 局面, 实际走法) 缓存在 JSON 文件中，
+重复运行或追加新的对局记录时只搜索缓存中没有的局面。
+评分损失 = 参考走法的评分 - 实际走法的评分，两者都由参考 AI 在同样深度下搜索（MinimaxAI.score_move）。
+参考 AI 不给出评分（多人搜索、贪心等）时只统计一致率。
+
+用法示例:
+  python analysis.py records/*.json --reference Minimax:depth=4 --workers 4 --cache analysis_cache.json
+  python analysis.py game.json --blunder 3 --json report.json
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+
+from board import Board
+from replay import GameRecord, parse_player
+
+DEFAULT_REFERENCE = "Minimax:depth=4"
+# 评分损失达到此值的走法记为失误（距离评估的单位，一步普通走法约改变 1）
+DEFAULT_BLUNDER = 3
+# 每完成这么多个局面保存一次缓存，中途中断也不丢失已完成的结果
+SAVE_INTERVAL = 50
+
+
+def normalize_move(move):
+    if move is None:
+        return None
+    (fr, fc), (tr, tc) = move
+    return (int(fr), int(fc)), (int(tr), int(tc))
+
+
+def reference_key(name, options):
+    """参考 AI 在缓存键中的写法：名称与按键排序的参数"""
+    return f"{name}:{json.dumps(options, sort_keys=True)}"
+
+
+def position_key(reference, player_id, snapshot, played):
+    (fr, fc), (tr, tc) = played
+    return f"{reference}|{player_id}|{snapshot}|{fr},{fc}-{tr},{tc}"
+
+
+def analyze_position(name, options, player_id, snapshot, played):
+    """
+    在工作进程中用参考 AI 搜索一个局面，返回 {"best": 参考走法, "best_score": 评分, "played_score": 实际走法的评分}。
+    参考 AI 按 (名称, 玩家, 参数) 缓存，固定种子使带随机性的参考 AI 结果也可缓存
+    """
+    from ai.registry import cached_ai
+
+    ai = cached_ai(name, player_id, options)
+    if hasattr(ai, "reseed"):
+        ai.reseed(0)
+    board = Board.from_snapshot(snapshot).board
+    best = normalize_move(ai.choose_move(board))
+    best_score = getattr(ai, "last_info", {}).get("score")
+    played_score = None
+    if hasattr(ai, "score_move"):
+        if best is not None and best_score is None:
+            # 未经搜索直接给出的走法（如让出目标区入口），补搜它的评分
+            best_score = ai.score_move(board, best)
+        played_score = best_score if played == best else ai.score_move(board, played)
+    return {"best": best, "best_score": best_score, "played_score": played_score}
+
+
+class AnalysisCache:
+    """局面分析结果的 JSON 缓存：{position_key: analyze_position 的结果}"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries[key]
+        return dict(entry, best=normalize_move(entry["best"]))
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+
+    def save(self):
+        if not self.path:
+            return
+        # 先写临时文件再替换，保存中途中断不会损坏已有的缓存
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+def record_positions(record):
+    """逐步重放对局，生成 (步数, 玩家编号, 走子前的局面, 实际走法)；轮空的步不参与分析"""
+    board = Board.from_snapshot(record.start)
+    for ply, (player, move) in enumerate(record.moves, 1):
+        if move is not None:
+            yield ply, player, board.snapshot(), normalize_move(move)
+            board.move_piece(*move)
+
+
+def analyze_records(records, name="Minimax", options=None, workers=None, cache=None, progress=None):
+    """
+    分析 records 中每局每一步，返回按对局、步数排列的结果列表，每项包含
+    record（对局序号）、ply、player、ai（记录中的 AI 名称）、played、best、agree、loss（无评分时为 None）。
+    cache 为 AnalysisCache，缓存中已有的局面不再搜索；progress(完成数, 待搜索数) 在每个局面搜完后调用
+    """
+    options = options or {}
+    cache = cache or AnalysisCache()
+    reference = reference_key(name, options)
+    positions = []
+    for index, record in enumerate(records):
+        for ply, player, snapshot, played in record_positions(record):
+            key = position_key(reference, player, snapshot, played)
+            positions.append((index, ply, player, record.players.get(player), played, snapshot, key))
+
+    pending = {}
+    for _, _, player, _, played, snapshot, key in positions:
+        if key not in cache and key not in pending:
+            pending[key] = (player, snapshot, played)
+    if pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_position, name, options, *args): key for key, args in pending.items()}
+            try:
+                for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    cache.put(futures[future], future.result())
+                    if progress:
+                        progress(done, len(pending))
+                    if done % SAVE_INTERVAL == 0:
+                        cache.save()
+            finally:
+                cache.save()
+
+    results = []
+    for index, ply, player, ai, played, _, key in positions:
+        entry = cache.get(key)
+        best_score, played_score = entry["best_score"], entry["played_score"]
+        loss = None
+        if best_score is not None and played_score is not None:
+            # 参考走法未经完整搜索时实际走法可能更好，记为无损失
+            loss = max(0, best_score - played_score)
+        results.append({"record": index, "ply": ply, "player": player, "ai": ai, "played": played,
+                        "best": entry["best"], "agree": played == entry["best"], "loss": loss})
+    return results
+
+
+def summarize(results, blunder=DEFAULT_BLUNDER):
+    """按记录中的 AI 名称汇总：步数、一致率、平均 / 最大评分损失、失误数"""
+    groups = {}
+    for item in results:
+        groups.setdefault(item["ai"], []).append(item)
+    summary = {}
+    for ai, items in groups.items():
+        losses = [item["loss"] for item in items if item["loss"] is not None]
+        summary[ai] = {
+            "moves": len(items),
+            "agreement": sum(item["agree"] for item in items) / len(items),
+            "mean_loss": sum(losses) / len(losses) if losses else None,
+            "max_loss": max(losses) if losses else None,
+            "blunders": sum(loss >= blunder for loss in losses),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用参考 AI 重新搜索对局记录，统计评分损失与一致率")
+    parser.add_argument("records", nargs="+", help="对局记录 JSON 文件")
+    parser.add_argument("--reference", default=DEFAULT_REFERENCE, help="参考 AI（名称[:k=v,...]）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument("--cache", default="analysis_cache.json", help="分析结果缓存文件，传空字符串不使用缓存")
+    parser.add_argument("--blunder", type=float, default=DEFAULT_BLUNDER, help="记为失误的评分损失下限")
+    parser.add_argument("--json", help="把逐步结果与汇总写入该 JSON 文件")
+    args = parser.parse_args(argv)
+
+    records = [GameRecord.load(path) for path in args.records]
+    name, options = parse_player(args.reference)
+    cache = AnalysisCache(args.cache or None)
+
+    def progress(done, total):
+        print(f"\r已分析 {done}/{total} 个局面", end="", flush=True)
+
+    results = analyze_records(records, name, options, args.workers, cache, progress)
+    print()
+    summary = summarize(results, args.blunder)
+    print(f"参考 AI：{args.reference}，共 {len(results)} 步")
+    for ai, stats in summary.items():
+        line = f"{ai}：{stats['moves']} 步，一致率 {stats['agreement']:.1%}"
+        if stats["mean_loss"] is not None:
+            line += (f"，平均损失 {stats['mean_loss']:.2f}，最大损失 {stats['max_loss']:g}，"
+                     f"失误 {stats['blunders']} 次")
+        print(line)
+    for item in results:
+        if item["loss"] is not None and item["loss"] >= args.blunder:
+            print(f"  {args.records[item['record']]} 第 {item['ply']} 步 玩家 {item['player']} ({item['ai']})："
+                  f"{item['played']}，参考 {item['best']}，损失 {item['loss']:g}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"reference": args.reference, "summary": summary, "moves": results}, f, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,159 +1,190 @@
+from array import array
+from bisect import insort
+
 import numpy as np
-from colorama import Fore, Style
+
+from geometry import geometry_for, get_geometry, square_geometry
+
+# 计分胜利所需分数
+WIN_SCORE = 12
+
+
+def target_status(board, geometry=None):
+    """
+    一次性计算各玩家得分与是否终局。
+    参数:
+      board: numpy 棋盘数组
+      geometry: 棋盘几何，默认根据 board 推断
+    返回:
+      (scores, game_over)，scores 为 {玩家编号: 目标区域内棋子数}
+    """
+    geometry = geometry or geometry_for(board)
+    flat = board.ravel()
+    hits = flat[geometry.target_index] == geometry.target_owner
+    counts = np.add.reduceat(hits, geometry.target_starts)
+    scores = {p: int(c) for p, c in zip(geometry.players, counts)}
+    game_over = bool((counts >= WIN_SCORE).any())
+    if not game_over:
+        # 传统胜利：目标区被填满，且该玩家没有棋子留在目标区域之外
+        for p, c, size in zip(geometry.players, counts, geometry.target_sizes):
+            if c == size and not (flat[geometry.outside_zone_index[p]] == p).any():
+                game_over = True
+                break
+    return scores, game_over
+
+
+class PieceList:
+    """
+    一位玩家的棋子位置：按行优先升序排列的扁平格子下标（行 * 列数 + 列），遍历顺序与
+    np.argwhere(board == 玩家) 一致。由 Board.move_piece 和搜索的 make/unmake 增量维护，
+    走法生成与评估只需遍历这十来个棋子，不必扫描整个棋盘
+    """
+    __slots__ = ("player_id", "cols", "cells")
+
+    def __init__(self, player_id, cols, cells=()):
+        self.player_id = player_id
+        self.cols = cols
+        self.cells = array("H", sorted(cells))
+
+    @classmethod
+    def from_board(cls, board, player_id):
+        return cls(player_id, board.shape[1], np.flatnonzero(board.ravel() == player_id).tolist())
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        cols = self.cols
+        for index in self.cells:
+            yield divmod(index, cols)
+
+    def __contains__(self, pos):
+        return int(pos[0]) * self.cols + int(pos[1]) in self.cells
+
+    def __repr__(self):
+        return f"PieceList({self.player_id}, {list(self)})"
+
+    def move(self, from_pos, to_pos):
+        """棋子从 from_pos 移到 to_pos（撤销时交换两个参数即可）"""
+        cells = self.cells
+        cells.remove(int(from_pos[0]) * self.cols + int(from_pos[1]))
+        insort(cells, int(to_pos[0]) * self.cols + int(to_pos[1]))
+
+    def copy(self):
+        pieces = PieceList.__new__(PieceList)
+        pieces.player_id = self.player_id
+        pieces.cols = self.cols
+        pieces.cells = array("H", self.cells)
+        return pieces
+
+    def distance_sum(self, table):
+        """table 为展平的距离表（如 geometry.target_distance_flat[玩家]），返回所有棋子的距离之和"""
+        return sum([table[index] for index in self.cells])
+
+
+def piece_lists(board, geometry=None):
+    """{玩家编号: PieceList}，从棋盘扫描一次建立"""
+    geometry = geometry or geometry_for(board)
+    return {p: PieceList.from_board(board, p) for p in geometry.players}
+
 
 class Board:
-    def __init__(self):
-        # 初始化 12x12 棋盘，全为 0 表示空位
-        self.board = np.zeros((12, 12), dtype=int)
+    def __init__(self, geometry=None):
+        # 棋盘几何（默认 12x12 方格、两人对战）；不可用的格子为 -1，空位为 0
+        self.geometry = geometry or square_geometry()
+        self.board = self.geometry.empty_board()
         # 移除奖励点相关定义
         self.init_pieces()
 
     def get_points_score(self, player_id):
         # 统计玩家有多少个棋子到达目标区域
-        if player_id == 1:
-            # 玩家1目标区域为右下角三角形
-            target_positions = [
-                (11, 11),
-                (11, 10), (10, 11),
-                (11, 9), (10, 10), (9, 11),
-                (11, 8), (10, 9), (9, 10), (8, 11)
-            ]
-        elif player_id == 2:
-            # 玩家2目标区域为左上角三角形
-            target_positions = [
-                (0, 0),
-                (0, 1), (1, 0),
-                (0, 2), (1, 1), (2, 0),
-                (0, 3), (1, 2), (2, 1), (3, 0)
-            ]
-        else:
-            return 0
-        return sum(1 for pos in target_positions if self.board[pos] == player_id)
+        return self.status()[0].get(player_id, 0)
 
+    def status(self):
+        """返回 (各玩家得分, 是否终局)，计分与终局判定共用一次扫描"""
+        return target_status(self.board, self.geometry)
 
     def init_pieces(self):
         """
-        两人中国跳棋起始布局：  
+        按几何的起始区域摆放棋子，例如两人方格棋盘：
           - 玩家1起始区域：左上角三角形，目标区域：右下角三角形
           - 玩家2起始区域：右下角三角形，目标区域：左上角三角形
         """
-        # 玩家1的棋子（编号1）放在左上角三角形
-        # 第1层
-        self.board[0, 0] = 1
-        # 第2层
-        self.board[0, 1] = 1
-        self.board[1, 0] = 1
-        # 第3层
-        self.board[0, 2] = 1
-        self.board[1, 1] = 1
-        self.board[2, 0] = 1
-        # 第4层
-        self.board[0, 3] = 1
-        self.board[1, 2] = 1
-        self.board[2, 1] = 1
-        self.board[3, 0] = 1
-
-        # 玩家2的棋子（编号2）放在右下角三角形
-        # 第1层
-        self.board[11, 11] = 2
-        # 第2层
-        self.board[11, 10] = 2
-        self.board[10, 11] = 2
-        # 第3层
-        self.board[11, 9] = 2
-        self.board[10, 10] = 2
-        self.board[9, 11] = 2
-        # 第4层
-        self.board[11, 8] = 2
-        self.board[10, 9] = 2
-        self.board[9, 10] = 2
-        self.board[8, 11] = 2
+        for player, cells in self.geometry.start_cells.items():
+            for pos in cells:
+                self.board[pos] = player
+        self.pieces = piece_lists(self.board, self.geometry)
 
     def move_piece(self, from_pos, to_pos):
         """移动棋子，如果目标位置为空则移动成功"""
         moved = False
         if self.board[to_pos] == 0:
-            self.board[to_pos] = self.board[from_pos]
+            player = int(self.board[from_pos])
+            self.board[to_pos] = player
             self.board[from_pos] = 0
+            if player > 0:
+                self.pieces[player].move(from_pos, to_pos)
             moved = True
         return moved
 
+    def snapshot(self):
+        """
+        紧凑序列化当前局面："<棋盘类型>/<人数>/<各可用格的编号>"，
+        可用格按 geometry.cells 顺序逐格一个字符（'0' 为空位），不可用的格子不存储
+        """
+        name, num_players = self.geometry.key
+        cells = self.board[self.geometry.valid]
+        return f"{name}/{num_players}/" + "".join(map(str, cells.tolist()))
+
+    def restore(self, snapshot):
+        """恢复 snapshot() 得到的局面；几何不同时一并切换"""
+        name, num_players, cells = snapshot.split("/")
+        geometry = get_geometry(name, int(num_players))
+        if len(cells) != len(geometry.cells):
+            raise ValueError(f"局面格数 {len(cells)} 与 {geometry} 不符")
+        if geometry is not self.geometry:
+            self.geometry = geometry
+            self.board = geometry.empty_board()
+        self.board[geometry.valid] = np.frombuffer(cells.encode(), dtype=np.uint8) - ord("0")
+        self.pieces = piece_lists(self.board, geometry)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        board = cls.__new__(cls)
+        board.geometry = None
+        board.restore(snapshot)
+        return board
+
     def get_valid_moves(self, pos):
-        """获取指定位置的所有基本（上下左右）合法移动"""
-        x, y = pos
-        moves = []
-        directions = [(-1,0), (1,0), (0,-1), (0,1)]
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < 12 and 0 <= ny < 12 and self.board[nx, ny] == 0:
-                moves.append((nx, ny))
-        return moves
+        """获取指定位置的所有基本（相邻格）合法移动"""
+        return [n for n in self.geometry.steps[pos] if self.board[n] == 0]
 
     def get_jump_moves(self, pos):
-        """获取指定位置的所有跳跃移动（检查8个方向）"""
-        x, y = pos
-        jumps = []
-        directions = [(-1, -1), (-1, 0), (-1, 1),
-                      (0, -1),           (0, 1),
-                      (1, -1),  (1, 0),  (1, 1)]
-        for dx, dy in directions:
-            midx, midy = x + dx, y + dy
-            landingx, landingy = x + 2*dx, y + 2*dy
-            if (0 <= midx < 12 and 0 <= midy < 12 and self.board[midx, midy] != 0 and
-                0 <= landingx < 12 and 0 <= landingy < 12 and self.board[landingx, landingy] == 0):
-                jumps.append((landingx, landingy))
-        return jumps
+        """获取指定位置的所有跳跃移动（越过相邻棋子落到其后方的空位）"""
+        return [land for mid, land in self.geometry.jumps[pos]
+                if self.board[mid] > 0 and self.board[land] == 0]
 
     def is_game_over(self):
         """
         胜利条件：某一玩家分数>=12分 或 所有棋子到达目标区域且目标区被填满
         """
-        # 计分胜利
-        p1_score = self.get_points_score(1)
-        p2_score = self.get_points_score(2)
-        if p1_score >= 12 or p2_score >= 12:
-            return True
-        # 传统胜利
-        p1_target_positions = [
-            (11, 11),  # 第1层
-            (11, 10), (10, 11),  # 第2层
-            (11, 9), (10, 10), (9, 11),  # 第3层
-            (11, 8), (10, 9), (9, 10), (8, 11)  # 第4层
-        ]
-        p1_pieces = np.argwhere(self.board == 1)
-        p1_all_in_target = all(self.in_target_area(tuple(pos)) for pos in p1_pieces)
-        p1_target_filled = all(self.board[pos] == 1 for pos in p1_target_positions)
-
-        p2_target_positions = [
-            (0, 0),  # 第1层
-            (0, 1), (1, 0),  # 第2层
-            (0, 2), (1, 1), (2, 0),  # 第3层
-            (0, 3), (1, 2), (2, 1), (3, 0)  # 第4层
-        ]
-        p2_pieces = np.argwhere(self.board == 2)
-        p2_all_in_target = all(self.in_target_area(tuple(pos)) for pos in p2_pieces)
-        p2_target_filled = all(self.board[pos] == 2 for pos in p2_target_positions)
-
-        return (p1_all_in_target and p1_target_filled) or (p2_all_in_target and p2_target_filled)
+        return self.status()[1]
 
     def in_target_area(self, pos):
         """检查位置是否在目标区域内"""
-        x, y = pos
-        # 玩家1的目标区域（右下角三角形）
-        if self.board[pos] == 1:
-            return (x >= 8 and y >= 8 and (x + y >= 16))
-        # 玩家2的目标区域（左上角三角形）
-        elif self.board[pos] == 2:
-            return (x <= 3 and y <= 3 and (x + y <= 6))
+        player = self.board[pos]
+        if player in self.geometry.target_zone_masks:
+            return bool(self.geometry.target_zone_masks[player][pos])
         return False
 
     def render(self):
         """彩色渲染棋盘至终端"""
-        symbols = {
-            0: Fore.WHITE + '.' + Style.RESET_ALL,
-            1: Fore.RED + '●' + Style.RESET_ALL,
-            2: Fore.BLUE + '●' + Style.RESET_ALL
-        }
+        # 只在渲染时需要 colorama，无界面运行（引擎、对局服务器）不必加载
+        from colorama import Fore, Style
+        colors = [Fore.RED, Fore.BLUE, Fore.GREEN, Fore.YELLOW, Fore.MAGENTA, Fore.CYAN]
+        symbols = {-1: ' ', 0: Fore.WHITE + '.' + Style.RESET_ALL}
+        for player in self.geometry.players:
+            symbols[player] = colors[(player - 1) % len(colors)] + '●' + Style.RESET_ALL
         print("\n当前棋盘状态：")
         for row in self.board:
             print(' '.join([symbols[cell] for cell in row]))
@@ -0,0 +1,16 @@
+import importlib
+
+# 名称 -> 所在子模块；按需导入，子进程引擎（engine.adapter）不必加载 subprocess / threading
+_EXPORTS = {
+    "EngineClient": ".client",
+    "EngineError": ".client",
+    "EnginePool": ".pool",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
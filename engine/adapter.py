@@ -0,0 +1,109 @@
+"""
+引擎适配器：把任意实现了 choose_move 的 AI 包装成按 engine.protocol 通信的引擎进程
+
+用法:
+  python -m engine.adapter [--ai Greedy --player 1 [k=v ...]]
+
+同一进程内可通过多次 setai 持有多个 AI 实例（按名称、玩家、参数缓存），
+实例在进程生命周期内一直保留，其内部缓存可跨对局复用。
+"""
+import argparse
+import sys
+import time
+
+from ai.registry import create_ai
+from . import protocol
+
+
+class EngineAdapter:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.instances = {}
+        self.ai = None
+        self.board = None
+
+    def send(self, line):
+        self.out.write(line + "\n")
+        self.out.flush()
+
+    def set_ai(self, name, player_id, options=None):
+        options = options or {}
+        key = (name, player_id, protocol.format_options(options))
+        if key not in self.instances:
+            self.instances[key] = create_ai(name, player_id, **options)
+        self.ai = self.instances[key]
+        return self.ai
+
+    def think(self, params):
+        """根据 go 参数计算走法，返回 (走法, info 字典)"""
+        start = time.perf_counter()
+        deadline = start + params["movetime"] / 1000 if "movetime" in params else None
+        move = self.ai.choose_move(self.board, deadline=deadline)
+        info = {"time": int((time.perf_counter() - start) * 1000)}
+        info.update(getattr(self.ai, "last_info", None) or {})
+        return move, info
+
+    def handle(self, line):
+        """处理一行命令；返回 False 表示应退出"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        cmd, args = tokens[0], tokens[1:]
+        if cmd == "quit":
+            return False
+        if cmd == "protocol":
+            name = self.ai.__class__.__name__ if self.ai else "none"
+            self.send(f"id name {name}")
+            self.send(f"id protocol {protocol.PROTOCOL_VERSION}")
+            self.send("protocolok")
+        elif cmd == "isready":
+            self.send("readyok")
+        elif cmd == "setai":
+            if len(args) < 2:
+                raise protocol.ProtocolError("用法：setai <名称> <玩家编号> [k=v ...]")
+            ai = self.set_ai(args[0], int(args[1]), protocol.parse_options(args[2:]))
+            self.send(f"aiok {ai.__class__.__name__}")
+        elif cmd == "position":
+            self.board = protocol.decode_board(" ".join(args))
+        elif cmd == "seed":
+            if self.ai is None or len(args) != 1:
+                raise protocol.ProtocolError("用法：setai 之后 seed <整数>")
+            if hasattr(self.ai, "reseed"):
+                self.ai.reseed(int(args[0]))
+        elif cmd == "go":
+            if self.ai is None or self.board is None:
+                raise protocol.ProtocolError("go 之前需要先 setai 和 position")
+            move, info = self.think(protocol.parse_go(args))
+            self.send(protocol.format_info(info))
+            self.send(f"bestmove {protocol.format_move(move)}")
+        else:
+            raise protocol.ProtocolError(f"未知命令：{cmd}")
+        return True
+
+    def run(self, stream=None):
+        stream = stream or sys.stdin
+        for line in stream:
+            try:
+                if not self.handle(line):
+                    break
+            except Exception as exc:  # 单条命令出错不应让引擎退出
+                self.send(f"error {type(exc).__name__}: {exc}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="以子进程引擎方式运行 AI")
+    parser.add_argument("--ai", help="初始 AI 名称")
+    parser.add_argument("--player", type=int, default=1, help="初始 AI 的玩家编号")
+    parser.add_argument("options", nargs="*", help="AI 构造参数，k=v 形式")
+    args = parser.parse_args(argv)
+
+    # 协议只走原始 stdout；AI 内部的 print 输出重定向到 stderr，避免污染协议流
+    adapter = EngineAdapter(out=sys.stdout)
+    sys.stdout = sys.stderr
+    if args.ai:
+        adapter.set_ai(args.ai, args.player, protocol.parse_options(args.options))
+    adapter.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+引擎客户端：在独立子进程中运行 AI，对外提供与 AI 相同的 choose_move 接口，
+可直接作为 Game / GameGUI 的玩家使用。引擎崩溃或超时时返回 None（由调用方兜底），
+下一次调用会自动重启引擎进程。
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from . import protocol
+
+# 项目根目录，子进程需要在此目录下才能导入 ai、board 等模块
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 给定截止时刻时，额外等待引擎回复的余量（秒）
+DEADLINE_GRACE = 0.5
+
+
+class EngineError(RuntimeError):
+    """引擎进程异常退出、超时或返回错误"""
+
+
+def _limit_resources(memory_mb, cpu_seconds, cpus):
+    """返回在子进程中设置资源限制的 preexec_fn（仅 POSIX）"""
+    if memory_mb is None and cpu_seconds is None and cpus is None:
+        return None
+
+    def apply():
+        import resource
+        if memory_mb is not None:
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if cpu_seconds is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        if cpus is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, set(cpus))
+    return apply
+
+
+class EngineClient:
+    def __init__(self, ai_name, player_id, ai_options=None, move_timeout=None,
+                 startup_timeout=10.0, memory_mb=None, cpu_seconds=None, cpus=None):
+        """
+        参数:
+          ai_name: ai.registry 中注册的 AI 名称，如 "Greedy"、"Minimax"
+          player_id: 玩家编号
+          ai_options: AI 构造参数，如 {"depth": 3}
+          move_timeout: 单步思考的超时秒数，超时则杀掉引擎进程并返回 None
+          memory_mb / cpu_seconds: 子进程地址空间与 CPU 时间上限
+          cpus: 将子进程绑定到的 CPU 编号集合
+        """
+        self.ai_name = ai_name
+        self.player_id = player_id
+        self.ai_options = ai_options or {}
+        self.move_timeout = move_timeout
+        self.startup_timeout = startup_timeout
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.cpus = cpus
+        self.process = None
+        self.engine_name = ai_name
+        self.last_info = {}
+        self.last_error = None
+        self.seed = None
+        self.loaded = set()
+        self._lines = None
+
+    @property
+    def display_name(self):
+        return f"{self.engine_name}[子进程]"
+
+    def start(self):
+        if self.is_alive():
+            return
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "engine.adapter"],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            preexec_fn=_limit_resources(self.memory_mb, self.cpu_seconds, self.cpus),
+        )
+        # 后台线程逐行读取引擎输出，主线程用带超时的 queue.get 等待
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.process.stdout, self._lines),
+                         daemon=True).start()
+        self.send(f"protocol {protocol.PROTOCOL_VERSION}")
+        self.read_until("protocolok", self.startup_timeout)
+        self.loaded = set()
+        self.select_ai(self.ai_name, self.player_id, self.ai_options)
+
+    def select_ai(self, ai_name, player_id, ai_options=None):
+        """切换引擎当前使用的 AI；同一进程内已创建过的实例会被复用"""
+        self.ai_name = ai_name
+        self.player_id = player_id
+        self.ai_options = ai_options or {}
+        if not self.is_alive():
+            self.start()
+            return
+        options = protocol.format_options(self.ai_options)
+        self.send(f"setai {ai_name} {player_id} {options}".rstrip())
+        reply = self.read_until("aiok", self.startup_timeout)
+        self.engine_name = reply.split()[1]
+        self.loaded.add((ai_name, player_id, options))
+        if self.seed is not None:
+            self.send(f"seed {self.seed}")
+
+    def reseed(self, seed):
+        """为引擎中的 AI 设定种子（Game 每步调用）；引擎尚未启动时在启动后发送"""
+        self.seed = seed
+        if self.is_alive():
+            try:
+                self.send(f"seed {seed}")
+            except EngineError:
+                # 进程已退出：下一次 choose_move 重启引擎时会重新发送种子
+                self.kill()
+
+    @staticmethod
+    def _read_lines(stream, lines):
+        for line in stream:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)
+
+    def send(self, line):
+        try:
+            self.process.stdin.write(line + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise EngineError("引擎进程已退出") from exc
+
+    def read_until(self, prefix, timeout):
+        """读取输出直到遇到以 prefix 开头的行，途中的 info 行记入 last_info"""
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                raise EngineError(f"等待引擎回复 {prefix} 超时")
+            if line is None:
+                raise EngineError("引擎进程已退出")
+            if line.startswith("error"):
+                raise EngineError(line)
+            if line.startswith("info "):
+                self.last_info = self._parse_info(line)
+            if line.split(" ", 1)[0] == prefix:
+                return line
+
+    @staticmethod
+    def _parse_info(line):
+        tokens = line.split()[1:]
+        info = {}
+        i = 0
+        while i < len(tokens):
+            key = tokens[i]
+            if key == "pv":
+                info["pv"] = [protocol.parse_move(t) for t in tokens[i + 1:]]
+                break
+            info[key] = tokens[i + 1] if i + 1 < len(tokens) else ""
+            i += 2
+        return info
+
+    def go(self, board, timeout=None, **params):
+        """发送局面与 go 命令，返回引擎给出的走法；失败时抛出 EngineError"""
+        self.start()
+        self.send(f"position {protocol.encode_board(board)}")
+        args = " ".join(f"{key} {int(value)}" for key, value in params.items())
+        self.send(f"go {args}".rstrip())
+        reply = self.read_until("bestmove", timeout if timeout is not None else self.move_timeout)
+        return protocol.parse_move(reply.split()[1])
+
+    def choose_move(self, board, deadline=None):
+        params = {}
+        timeout = self.move_timeout
+        if deadline is not None:
+            remaining = max(deadline - time.perf_counter(), 0.0)
+            params["movetime"] = remaining * 1000
+            # 留出进程通信余量后仍未返回即视为超时
+            timeout = remaining + DEADLINE_GRACE if timeout is None else min(timeout, remaining + DEADLINE_GRACE)
+        try:
+            move = self.go(board, timeout=timeout, **params)
+        except EngineError as exc:
+            # 引擎崩溃或超时：结束进程，下次调用时重启
+            self.last_error = exc
+            self.kill()
+            return None
+        self.last_error = None
+        return move
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+        # 进程内创建过的 AI 实例随进程一起丢失
+        self.loaded = set()
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.send("quit")
+            self.process.wait(timeout=2)
+        except (EngineError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
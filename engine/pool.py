@@ -0,0 +1,131 @@
+"""
+引擎进程池：维护若干常驻的引擎工作进程，对局向池借用引擎、结束后归还。
+
+工作进程在整个池的生命周期内保持运行，其中创建过的 AI 实例（连同置换表、
+开局库、启发式表等内部缓存）在多局之间一直保留，借用时优先分配已经持有
+相同 AI 配置的进程，省去每局重新启动与预热的开销。
+
+用法:
+  with EnginePool(size=4, warmup=[("Minimax", 1, {"depth": 2})]) as pool:
+      with pool.borrow("Minimax", 1, depth=2) as p1, pool.borrow("Greedy", 2) as p2:
+          Game(p1, p2).run()
+"""
+import contextlib
+import os
+import threading
+
+from board import Board
+from . import protocol
+from .client import EngineClient, EngineError
+
+# 预热时每次思考的超时秒数：超时或出错的进程被结束，借用时再冷启动，不阻塞池的创建
+WARMUP_TIMEOUT = 30.0
+
+
+class EnginePool:
+    def __init__(self, size=2, warmup=(), warmup_timeout=WARMUP_TIMEOUT, **client_options):
+        """
+        参数:
+          size: 工作进程数
+          warmup: 启动时在每个进程中预先创建并预热的 AI 配置，
+                  元素为 (名称, 玩家编号, 构造参数字典)
+          warmup_timeout: 预热时每次思考的超时秒数
+          client_options: 透传给 EngineClient 的参数（超时、资源限制等）；
+                          cpus="pin" 时每个进程各绑定一个核心
+        """
+        self.size = size
+        self.warmup_specs = list(warmup)
+        self.warmup_timeout = warmup_timeout
+        self.client_options = client_options
+        self.idle = []
+        self.busy = set()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def start(self):
+        for i in range(self.size):
+            worker = self._new_worker(i)
+            self.idle.append(worker)
+        return self
+
+    def _new_worker(self, index):
+        options = dict(self.client_options)
+        cpus = options.pop("cpus", None)
+        if cpus == "pin":
+            # 每个工作进程绑定一个核心
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+            cpus = {cores[index % len(cores)]} if cores else None
+        name, player_id, ai_options = self.warmup_specs[0] if self.warmup_specs else ("Greedy", 1, {})
+        worker = EngineClient(name, player_id, ai_options, cpus=cpus, **options)
+        worker.start()
+        self.warm_up(worker)
+        return worker
+
+    def warm_up(self, worker):
+        """
+        在工作进程中创建所有预热配置的 AI，并各在初始局面上思考一次；
+        预热卡死或出错时结束该进程（借用时再冷启动），不阻塞池的创建
+        """
+        board = Board().board
+        for name, player_id, ai_options in self.warmup_specs:
+            try:
+                worker.select_ai(name, player_id, ai_options)
+                worker.go(board, timeout=self.warmup_timeout)
+            except EngineError:
+                worker.kill()
+                return
+
+    @staticmethod
+    def _spec_key(name, player_id, ai_options):
+        return (name, player_id, protocol.format_options(ai_options))
+
+    def acquire(self, name, player_id, timeout=None, **ai_options):
+        """借出一个已切换到指定 AI 的引擎；池中无空闲进程时阻塞等待"""
+        key = self._spec_key(name, player_id, ai_options)
+        with self._cond:
+            if self._closed:
+                raise EngineError("引擎池已关闭")
+            if not self._cond.wait_for(lambda: self.idle, timeout):
+                raise EngineError("等待空闲引擎超时")
+            # 优先选择仍在运行且已经持有该 AI 实例（缓存已预热）的进程
+            worker = next((w for w in self.idle if key in w.loaded and w.is_alive()), self.idle[0])
+            self.idle.remove(worker)
+            self.busy.add(worker)
+        try:
+            worker.select_ai(name, player_id, ai_options)
+        except EngineError:
+            # 进程已失效：重启后再切换
+            worker.kill()
+            worker.select_ai(name, player_id, ai_options)
+        return worker
+
+    def release(self, worker):
+        with self._cond:
+            self.busy.discard(worker)
+            if self._closed:
+                worker.close()
+                return
+            self.idle.append(worker)
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def borrow(self, name, player_id, timeout=None, **ai_options):
+        worker = self.acquire(name, player_id, timeout, **ai_options)
+        try:
+            yield worker
+        finally:
+            self.release(worker)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self.idle = self.idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
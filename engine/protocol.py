@@ -0,0 +1,109 @@
+"""
+引擎文本协议（每条命令/回复占一行，UTF-8）
+
+客户端 -> 引擎:
+  protocol 1                         握手，引擎回复若干 "id ..." 行后回复 "protocolok"
+  isready                            引擎回复 "readyok"
+  setai <名称> <玩家编号> [k=v ...]   选择（必要时创建）AI，回复 "aiok <类名>"
+  position <行>x<列> <棋盘>           设置局面，棋盘按行展开，每格一个字符
+  seed <整数>                        为当前 AI 的随机数生成器设定种子（无随机性的 AI 忽略）
+  go [movetime <毫秒>]               开始思考，movetime 为本步可用时间（引擎据此设定截止
+                                     时刻）；引擎输出若干 "info ..." 行，最后输出
+                                     "bestmove r,c-r,c" 或 "bestmove none"
+  quit                               退出
+
+引擎 -> 客户端的出错回复统一为 "error <说明>"。
+棋盘字符：'.' 空位，'#' 不可用的格子，'1'-'9' 玩家编号。
+"""
+import ast
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+_CELL_TO_CHAR = {0: ".", -1: "#"}
+_CHAR_TO_CELL = {".": 0, "#": -1}
+
+
+class ProtocolError(ValueError):
+    """协议行无法解析"""
+
+
+def encode_board(board):
+    """numpy 棋盘 -> "12x12 ....1..." 形式的文本"""
+    rows, cols = board.shape
+    cells = "".join(_CELL_TO_CHAR.get(int(v), str(int(v))) for v in board.ravel())
+    return f"{rows}x{cols} {cells}"
+
+
+def decode_board(text):
+    """encode_board 的逆过程"""
+    try:
+        shape, cells = text.split()
+        rows, cols = (int(v) for v in shape.split("x"))
+        values = [_CHAR_TO_CELL[c] if c in _CHAR_TO_CELL else int(c) for c in cells]
+    except ValueError as exc:
+        raise ProtocolError(f"无法解析棋盘：{text!r}") from exc
+    if len(values) != rows * cols:
+        raise ProtocolError(f"棋盘格数 {len(values)} 与尺寸 {rows}x{cols} 不符")
+    return np.array(values, dtype=int).reshape(rows, cols)
+
+
+def format_move(move):
+    if move is None:
+        return "none"
+    (fr, fc), (tr, tc) = move
+    return f"{int(fr)},{int(fc)}-{int(tr)},{int(tc)}"
+
+
+def parse_move(text):
+    if text == "none":
+        return None
+    try:
+        src, dst = text.split("-")
+        from_pos = tuple(int(v) for v in src.split(","))
+        to_pos = tuple(int(v) for v in dst.split(","))
+    except ValueError as exc:
+        raise ProtocolError(f"无法解析走法：{text!r}") from exc
+    return (from_pos, to_pos)
+
+
+def format_options(options):
+    """{"depth": 3} -> "depth=3" """
+    return " ".join(f"{key}={value!r}" for key, value in sorted(options.items()))
+
+
+def parse_options(tokens):
+    """["depth=3", ...] -> {"depth": 3}；无法按 Python 字面量解析的值保留为字符串"""
+    options = {}
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        if not sep:
+            raise ProtocolError(f"选项应为 key=value 形式：{token!r}")
+        try:
+            options[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            options[key] = value
+    return options
+
+
+def parse_go(tokens):
+    """解析 go 命令参数，返回 {参数名: 数值}"""
+    params = {}
+    it = iter(tokens)
+    for key in it:
+        try:
+            params[key] = int(next(it))
+        except (StopIteration, ValueError) as exc:
+            raise ProtocolError(f"go 参数 {key} 缺少数值") from exc
+    return params
+
+
+def format_info(info):
+    """{"time": 12, "depth": 2} -> "info depth 2 time 12" """
+    parts = []
+    for key, value in info.items():
+        if isinstance(value, (list, tuple)):
+            value = " ".join(format_move(m) if isinstance(m, tuple) else str(m) for m in value)
+        parts.append(f"{key} {value}")
+    return "info " + " ".join(parts)
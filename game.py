@@ -1,30 +1,106 @@
+import random
 import time
 from board import Board
+from geometry import default_geometry
+from timecontrol import GameClock
+from replay import GameRecord
+from ai.move_utils import get_all_moves
 
 class Game:
-    def __init__(self, player1_ai, player2_ai):
-        self.board = Board()
-        self.players = {1: player1_ai, 2: player2_ai}
-        self.current_player = 1
+    def __init__(self, player1_ai, player2_ai, *more_ais, time_control=None, geometry=None, seed=None):
+        """
+        player1_ai, player2_ai, *more_ais: 按玩家编号 1, 2, 3... 顺序排列的 AI
+        geometry: 棋盘几何，默认 2/4 人用方格棋盘、3/6 人用六角星棋盘
+        seed: 对局种子，默认随机生成；由它依次派生各 AI 的种子，并驱动兜底随机走法。
+              种子记入对局记录，不计时的对局可据此逐步复现（见 replay.verify_replay）
+        """
+        ais = (player1_ai, player2_ai) + more_ais
+        self.geometry = geometry or default_geometry(len(ais))
+        if len(ais) != self.geometry.num_players:
+            raise ValueError(f"{self.geometry.name} 棋盘需要 {self.geometry.num_players} 名玩家，实际为 {len(ais)}")
+        self.board = Board(self.geometry)
+        self.players = dict(zip(self.geometry.players, ais))
+        self.current_player = self.geometry.players[0]
+        # 计时模式下每位玩家独立计时，超时判负
+        self.clock = GameClock(time_control, self.geometry.players) if time_control else None
+        self.forfeited = None
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.agent_seeds = {p: self.rng.randrange(2 ** 32) for p in self.geometry.players}
+        # 逐步记录走法，可保存为 JSON 并用 replay.ReplayIndex 快速定位任意一步
+        self.record = GameRecord(self.geometry.key,
+                                 {p: getattr(ai, "display_name", ai.__class__.__name__)
+                                  for p, ai in self.players.items()},
+                                 self.board.snapshot(), seed=self.seed, agent_seeds=self.agent_seeds)
+
+    def next_player(self, player_id):
+        return self.geometry.next_player(player_id)
+
+    def move_seed(self, player_id):
+        """player_id 本步使用的种子：由其 AI 种子和当前步数决定，与 AI 实例此前用过多少随机数无关"""
+        return (self.agent_seeds[player_id] + len(self.record)) % 2 ** 32
+
+    def request_move(self):
+        """让当前玩家思考并返回走法；计时模式下把本步截止时刻传给 AI，超时记为判负"""
+        current_ai = self.players[self.current_player]
+        # 带随机性的 AI 提供 reseed(seed)，每步按本步种子重设（AI 实例跨对局复用、
+        # 引擎进程重启后结果仍一致）；无随机性的 AI（如 Minimax）不需要种子
+        if hasattr(current_ai, "reseed"):
+            current_ai.reseed(self.move_seed(self.current_player))
+        if self.clock is None:
+            return current_ai.choose_move(self.board.board)
+        deadline = self.clock.start(self.current_player, self.board.board)
+        move = current_ai.choose_move(self.board.board, deadline=deadline)
+        if self.clock.stop():
+            self.forfeited = self.current_player
+        return move
+
+    def fallback_move(self):
+        """AI 未给出走法时的兜底：用对局的随机数生成器从当前玩家的合法走法中随机选一手，无合法走法时返回 None"""
+        legal = get_all_moves(self.board.board, self.current_player, geometry=self.geometry,
+                              pieces=self.board.pieces[self.current_player])
+        return self.rng.choice(legal) if legal else None
+
+    def apply_move(self, move):
+        """当前玩家走 move（None 表示轮空）并记入对局记录；返回是否走子成功"""
+        moved = move is not None and self.board.move_piece(*move)
+        self.record.add_move(self.current_player, move if moved else None)
+        return moved
+
+    def is_over(self):
+        return self.forfeited is not None or self.board.is_game_over()
+
+    def winner(self):
+        """超时判负时返回其余玩家中得分最高者，否则返回目标区域内棋子最多的玩家"""
+        scores = self.board.status()[0]
+        if self.forfeited is not None:
+            scores.pop(self.forfeited)
+        return max(scores, key=scores.get)
         
     def run(self):
         print("游戏开始！")
         self.board.render()
         
-        while not self.board.is_game_over():
+        while not self.is_over():
             current_ai = self.players[self.current_player]
             print(f"玩家 {self.current_player} ({current_ai.__class__.__name__}) 的回合")
             
-            move = current_ai.choose_move(self.board.board)
+            move = self.request_move()
+            if self.forfeited is not None:
+                print(f"玩家 {self.current_player} 超时判负！")
+                break
+            if move is None:
+                move = self.fallback_move()
             if move:
                 from_pos, to_pos = move
                 print(f"移动棋子：{from_pos} -> {to_pos}")
-                self.board.move_piece(from_pos, to_pos)
             else:
                 print("没有合法移动！")
+            self.apply_move(move)
             
             self.board.render()
             time.sleep(1)
-            self.current_player = 2 if self.current_player == 1 else 1
+            self.current_player = self.next_player(self.current_player)
         
-        print("游戏结束！")
\ No newline at end of file
+        self.record.winner = self.winner()
+        print("游戏结束！")
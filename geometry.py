@@ -0,0 +1,294 @@
+"""
+棋盘几何：格子集合、相邻/跳跃表、各玩家起始与目标区域等预计算拓扑。
+
+目前提供两种棋盘:
+  - square：12x12 方格棋盘，单步走上下左右，跳跃可沿 8 个方向；支持 2 / 4 人
+  - star：121 孔六角星棋盘（映射到 17x17 数组，不可用的格子为 -1），
+          单步与跳跃均沿 6 个六角方向；支持 2 / 3 / 4 / 6 人
+
+棋盘仍以 numpy 二维数组表示（0 为空位，正整数为玩家编号，-1 为不可用格子），
+geometry_for(board) 可根据数组形状与玩家数找回对应的几何。
+"""
+import math
+
+import numpy as np
+
+# 方格棋盘：单步方向与跳跃方向（顺序决定走法生成顺序）
+SQUARE_STEP_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+SQUARE_JUMP_DIRS = ((-1, -1), (-1, 0), (-1, 1),
+                    (0, -1),           (0, 1),
+                    (1, -1),  (1, 0),  (1, 1))
+# 六角星棋盘：数组坐标 (row, col) = (r + 8, q + 8)，(q, r) 为轴坐标
+HEX_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, -1))
+
+# 方格棋盘四个角：(角点, 指向棋盘内部的方向)
+SQUARE_CORNERS = {
+    "top_left": ((0, 0), (1, 1)),
+    "bottom_right": ((11, 11), (-1, -1)),
+    "bottom_left": ((11, 0), (-1, 1)),
+    "top_right": ((0, 11), (1, -1)),
+}
+# 方格棋盘各玩家的 (起始角, 目标角)
+SQUARE_LAYOUT = {
+    1: ("top_left", "bottom_right"),
+    2: ("bottom_right", "top_left"),
+    3: ("bottom_left", "top_right"),
+    4: ("top_right", "bottom_left"),
+}
+SQUARE_PLAYER_COUNTS = {2: (1, 2), 4: (1, 2, 3, 4)}
+
+# 六角星的角按顺时针编号，0 为正上方；各人数下玩家 1..n 的起始角，目标为对角 (i + 3) % 6
+STAR_LAYOUTS = {
+    2: (0, 3),
+    3: (0, 2, 4),
+    4: (1, 2, 4, 5),
+    6: (0, 1, 2, 3, 4, 5),
+}
+STAR_SIZE = 4  # 每个角 4 层，共 10 个孔
+
+
+class Geometry:
+    def __init__(self, name, valid, step_dirs, jump_dirs, start_cells, target_cells,
+                 distance, layout, target_zones=None):
+        """
+        参数:
+          name: 几何名称（"square" / "star"）
+          valid: 布尔数组，True 表示该格可用
+          step_dirs / jump_dirs: 单步与跳跃方向（数组坐标增量）
+          start_cells / target_cells: {玩家编号: 格子列表}
+          distance: fn(a, b) -> 两格之间的步数距离
+          layout: fn(cell) -> 绘图用单位坐标 (x, y)
+          target_zones: {玩家编号: 格子列表}，终局判定时棋子必须全部位于此区域；默认与目标区域相同
+        """
+        self.name = name
+        self.valid = valid
+        self.shape = valid.shape
+        self.players = tuple(sorted(target_cells))
+        self.num_players = len(self.players)
+        self.cells = tuple(tuple(int(v) for v in p) for p in np.argwhere(valid))
+        self.step_dirs = np.array(step_dirs)
+        self.jump_dirs = np.array(jump_dirs)
+        self.distance = distance
+        self.layout = {cell: layout(cell) for cell in self.cells}
+
+        # 相邻表与跳跃表：steps[cell] = 相邻格，jumps[cell] = ((中间格, 落点), ...)
+        self.steps = {}
+        self.jumps = {}
+        for r, c in self.cells:
+            self.steps[(r, c)] = tuple((r + dr, c + dc) for dr, dc in step_dirs
+                                       if self.contains((r + dr, c + dc)))
+            self.jumps[(r, c)] = tuple(((r + dr, c + dc), (r + 2 * dr, c + 2 * dc)) for dr, dc in jump_dirs
+                                       if self.contains((r + dr, c + dc)) and self.contains((r + 2 * dr, c + 2 * dc)))
+
+        self.start_cells = {p: tuple(cells) for p, cells in start_cells.items()}
+        # 目标区域按到顶点的距离由近到远排列，第一个即最深处的目标格
+        self.deep_target = {}
+        self.target_cells = {}
+        self.target_distance = {}
+        self.entry_cells = {}
+        rows, cols = self.shape
+        for p, cells in target_cells.items():
+            tip = max(cells, key=lambda cell: self.distance(cell, self.center))
+            ordered = tuple(sorted(cells, key=lambda cell: (distance(cell, tip), cell)))
+            self.deep_target[p] = tip
+            self.target_cells[p] = ordered
+            table = np.zeros(self.shape, dtype=int)
+            for r in range(rows):
+                for c in range(cols):
+                    table[r, c] = distance((r, c), tip)
+            self.target_distance[p] = table
+            # 目标区域最外层（入口层）
+            outer = max(table[cell] for cell in ordered)
+            self.entry_cells[p] = tuple(cell for cell in ordered if table[cell] == outer)
+        self.target_masks = {p: self.mask(cells) for p, cells in self.target_cells.items()}
+        zones = target_zones or self.target_cells
+        self.target_zone_masks = {p: self.mask(cells) for p, cells in zones.items()}
+
+        # 计分用的展平下标表：所有玩家的目标格拼接在一起，一次花式索引即可完成计分
+        self.target_index = np.concatenate([np.flatnonzero(self.target_masks[p]) for p in self.players])
+        self.target_owner = np.concatenate([np.full(len(self.target_cells[p]), p) for p in self.players])
+        self.target_sizes = np.array([len(self.target_cells[p]) for p in self.players])
+        self.target_starts = np.concatenate(([0], np.cumsum(self.target_sizes)[:-1]))
+        self.outside_zone_index = {p: np.flatnonzero(~self.target_zone_masks[p]) for p in self.players}
+        # 展平的目标距离表（Python 列表），按棋子列表（board.PieceList）的扁平下标直接查表求和
+        self.target_distance_flat = {p: self.target_distance[p].ravel().tolist() for p in self.players}
+
+        # 向量化走法生成用的偏移量：先单步方向，再跳跃方向
+        self.move_offsets = np.concatenate([self.step_dirs, 2 * self.jump_dirs])
+        self.mid_offsets = np.concatenate([np.zeros_like(self.step_dirs), self.jump_dirs])
+        self.is_jump = np.array([False] * len(step_dirs) + [True] * len(jump_dirs))
+
+    @property
+    def center(self):
+        return (self.shape[0] // 2, self.shape[1] // 2)
+
+    @property
+    def key(self):
+        """(名称, 玩家数)，可用 get_geometry(*key) 重建"""
+        return (self.name, self.num_players)
+
+    def contains(self, pos):
+        r, c = pos
+        return 0 <= r < self.shape[0] and 0 <= c < self.shape[1] and bool(self.valid[r, c])
+
+    def mask(self, cells):
+        mask = np.zeros(self.shape, dtype=bool)
+        for cell in cells:
+            mask[cell] = True
+        return mask
+
+    def empty_board(self):
+        return np.where(self.valid, 0, -1).astype(int)
+
+    def next_player(self, player_id):
+        return self.players[(self.players.index(player_id) + 1) % self.num_players]
+
+    def __repr__(self):
+        return f"Geometry({self.name!r}, players={self.players})"
+
+    def __reduce__(self):
+        # 同一 (名称, 人数) 的几何在进程内唯一，各处用 is 比较：跨进程传递时只传键，接收方取回本进程的实例
+        return get_geometry, self.key
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _corner_triangle(corner, size=4):
+    (r0, c0), (dr, dc) = SQUARE_CORNERS[corner]
+    return [(r0 + dr * i, c0 + dc * j) for i in range(size) for j in range(size - i)]
+
+
+def _corner_block(corner, size=4):
+    (r0, c0), (dr, dc) = SQUARE_CORNERS[corner]
+    return [(r0 + dr * i, c0 + dc * j) for i in range(size) for j in range(size)]
+
+
+def _axial(cell):
+    """数组坐标 -> 六角轴坐标 (q, r, s)"""
+    r = cell[0] - 2 * STAR_SIZE
+    q = cell[1] - 2 * STAR_SIZE
+    return q, r, -q - r
+
+
+def _hex_distance(a, b):
+    qa, ra, sa = _axial(a)
+    qb, rb, sb = _axial(b)
+    return max(abs(qa - qb), abs(ra - rb), abs(sa - sb))
+
+
+def _hex_layout(cell):
+    q, r, _ = _axial(cell)
+    return (q + r / 2, r * math.sqrt(3) / 2)
+
+
+def _star_valid():
+    """六角星 = 两个大三角形（各坐标均 >= -n，或均 <= n）的并集"""
+    n = STAR_SIZE
+    side = 4 * n + 1
+    valid = np.zeros((side, side), dtype=bool)
+    for row in range(side):
+        for col in range(side):
+            coords = _axial((row, col))
+            valid[row, col] = all(v >= -n for v in coords) or all(v <= n for v in coords)
+    return valid
+
+
+def _star_corners(valid):
+    """六角星的 6 个角（各 10 孔），按顺时针排列，0 为正上方"""
+    cells = [tuple(int(v) for v in p) for p in np.argwhere(valid)]
+    corners = []
+    for axis in range(3):
+        for sign in (-1, 1):
+            corners.append([cell for cell in cells if sign * _axial(cell)[axis] > STAR_SIZE])
+
+    def angle(corner):
+        x = sum(_hex_layout(c)[0] for c in corner) / len(corner)
+        y = sum(_hex_layout(c)[1] for c in corner) / len(corner)
+        return math.atan2(x, -y) % (2 * math.pi)
+
+    return sorted(corners, key=angle)
+
+
+_CACHE = {}
+
+
+def square_geometry(num_players=2):
+    """12x12 方格棋盘，2 人或 4 人"""
+    key = ("square", num_players)
+    if key not in _CACHE:
+        if num_players not in SQUARE_PLAYER_COUNTS:
+            raise ValueError(f"方格棋盘只支持 {'/'.join(map(str, SQUARE_PLAYER_COUNTS))} 人")
+        players = SQUARE_PLAYER_COUNTS[num_players]
+        _CACHE[key] = Geometry(
+            "square",
+            valid=np.ones((12, 12), dtype=bool),
+            step_dirs=SQUARE_STEP_DIRS,
+            jump_dirs=SQUARE_JUMP_DIRS,
+            start_cells={p: _corner_triangle(SQUARE_LAYOUT[p][0]) for p in players},
+            target_cells={p: _corner_triangle(SQUARE_LAYOUT[p][1]) for p in players},
+            target_zones={p: _corner_block(SQUARE_LAYOUT[p][1]) for p in players},
+            distance=_manhattan,
+            layout=lambda cell: (cell[1], cell[0]),
+        )
+    return _CACHE[key]
+
+
+def star_geometry(num_players=2):
+    """121 孔六角星棋盘，2 / 3 / 4 / 6 人"""
+    key = ("star", num_players)
+    if key not in _CACHE:
+        if num_players not in STAR_LAYOUTS:
+            raise ValueError(f"六角星棋盘只支持 {'/'.join(map(str, STAR_LAYOUTS))} 人")
+        valid = _star_valid()
+        corners = _star_corners(valid)
+        layout = STAR_LAYOUTS[num_players]
+        _CACHE[key] = Geometry(
+            "star",
+            valid=valid,
+            step_dirs=HEX_DIRS,
+            jump_dirs=HEX_DIRS,
+            start_cells={i + 1: corners[c] for i, c in enumerate(layout)},
+            target_cells={i + 1: corners[(c + 3) % 6] for i, c in enumerate(layout)},
+            distance=_hex_distance,
+            layout=_hex_layout,
+        )
+    return _CACHE[key]
+
+
+GEOMETRIES = {
+    "square": square_geometry,
+    "star": star_geometry,
+}
+
+
+def get_geometry(name="square", num_players=2):
+    if name not in GEOMETRIES:
+        raise ValueError(f"未知的棋盘类型：{name}（可选：{', '.join(GEOMETRIES)}）")
+    return GEOMETRIES[name](num_players)
+
+
+def default_geometry(num_players=2):
+    """2 / 4 人默认使用方格棋盘，3 / 6 人使用六角星棋盘"""
+    if num_players in SQUARE_PLAYER_COUNTS:
+        return square_geometry(num_players)
+    return star_geometry(num_players)
+
+
+_SHAPES = {(12, 12): ("square", SQUARE_PLAYER_COUNTS),
+           (4 * STAR_SIZE + 1, 4 * STAR_SIZE + 1): ("star", STAR_LAYOUTS)}
+_BOARD_CACHE = {}
+
+
+def geometry_for(board):
+    """根据棋盘数组的形状与最大玩家编号找回对应的几何"""
+    key = (board.shape, int(board.max()))
+    geometry = _BOARD_CACHE.get(key)
+    if geometry is None:
+        if board.shape not in _SHAPES:
+            raise ValueError(f"无法识别的棋盘尺寸：{board.shape}")
+        name, counts = _SHAPES[board.shape]
+        num_players = min((n for n in counts if n >= key[1]), default=max(counts))
+        geometry = _BOARD_CACHE[key] = get_geometry(name, num_players)
+    return geometry
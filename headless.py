@@ -0,0 +1,132 @@
+"""
+无界面入口：只导入核心模块（棋盘、几何、AI、引擎协议），不加载 tkinter、colorama、psutil、
+tracemalloc 等界面、渲染和性能分析依赖，适合锦标赛中大量短生命周期的工作进程。
+
+用法示例:
+  python headless.py engine --ai Minimax --player 1 depth=2    # 子进程引擎（同 python -m engine.adapter）
+  python headless.py play Minimax Greedy --games 4 --max-plies 400 --seed 1 --save-dir records
+  python headless.py import-time --repeat 5 --budget 300       # 测量核心模块的冷启动导入耗时
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# 无界面运行时不应被加载的模块
+FORBIDDEN_MODULES = ("tkinter", "PIL", "psutil", "colorama", "tracemalloc")
+
+# 工作进程实际用到的核心模块
+CORE_MODULES = ("engine.adapter", "game", "ai.registry", "ai.minimax_ai", "ai.greedy_ai")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import_time(modules=CORE_MODULES, repeat=5):
+    """
+    在全新的解释器进程中导入 modules，返回 (最短耗时秒数, 被加载的禁用模块列表)。
+    取多次中的最小值以排除磁盘缓存等干扰；不含解释器自身的启动时间
+    """
+    code = _PROBE.format(modules=tuple(modules), forbidden=FORBIDDEN_MODULES)
+    best, loaded = None, set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        result = json.loads(out)
+        best = result["seconds"] if best is None else min(best, result["seconds"])
+        loaded.update(result["loaded"])
+    return best, sorted(loaded)
+
+
+def play(names, games=1, max_plies=400, options=None, board_type=None, verbose=False, seed=None):
+    """
+    无界面对弈 games 局（不渲染、不等待），返回每局的对局记录（replay.GameRecord）。
+    给定 seed 时第 i 局的对局种子为 seed + i，整组对局可按种子复现
+    """
+    from ai.registry import create_ai
+    from game import Game
+    from geometry import default_geometry, get_geometry
+
+    geometry = get_geometry(board_type, len(names)) if board_type else default_geometry(len(names))
+    results = []
+    for i in range(games):
+        ais = [create_ai(name, player_id, **(options or {}))
+               for player_id, name in zip(geometry.players, names)]
+        game = Game(*ais, geometry=geometry, seed=None if seed is None else seed + i)
+        passes = 0
+        plies = 0
+        # 所有玩家连续轮空时无人能走，提前结束
+        while not game.is_over() and plies < max_plies and passes < geometry.num_players:
+            move = game.request_move()
+            if move is None:
+                move = game.fallback_move()
+            passes = 0 if game.apply_move(move) else passes + 1
+            if verbose:
+                print(f"玩家 {game.current_player}: {move}")
+            game.current_player = game.next_player(game.current_player)
+            plies += 1
+        game.record.winner = game.winner()
+        results.append(game.record)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面入口：子进程引擎 / 无界面对弈 / 导入耗时测量")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    engine = sub.add_parser("engine", help="以子进程引擎方式运行 AI")
+    engine.add_argument("args", nargs=argparse.REMAINDER, help="透传给 engine.adapter 的参数")
+
+    game = sub.add_parser("play", help="无界面对弈")
+    game.add_argument("players", nargs="+", help="按玩家编号顺序的 AI 名称（见 ai/registry.py）")
+    game.add_argument("--games", type=int, default=1)
+    game.add_argument("--max-plies", type=int, default=400)
+    game.add_argument("--board", choices=["square", "star"], help="棋盘类型，默认按人数选择")
+    game.add_argument("--seed", type=int, help="第一局的对局种子，之后每局加 1；默认随机")
+    game.add_argument("--save-dir", help="把每局的对局记录保存为该目录下的 JSON")
+    game.add_argument("--verbose", action="store_true")
+
+    probe = sub.add_parser("import-time", help="测量核心模块的导入耗时，并检查没有加载界面依赖")
+    probe.add_argument("--repeat", type=int, default=5)
+    probe.add_argument("--budget", type=float, help="导入耗时上限（毫秒），超过时返回非零退出码")
+
+    args = parser.parse_args(argv)
+    if args.command == "engine":
+        from engine.adapter import main as adapter_main
+        adapter_main(args.args)
+        return 0
+    if args.command == "play":
+        start = time.perf_counter()
+        records = play(args.players, args.games, args.max_plies, board_type=args.board,
+                       verbose=args.verbose, seed=args.seed)
+        if args.save_dir:
+            os.makedirs(args.save_dir, exist_ok=True)
+        for i, record in enumerate(records, 1):
+            print(f"第 {i} 局：玩家 {record.winner} ({record.players[record.winner]}) 胜，"
+                  f"共 {len(record)} 步，种子 {record.seed}")
+            if args.save_dir:
+                record.save(os.path.join(args.save_dir, f"game_{record.seed}.json"))
+        print(f"用时 {time.perf_counter() - start:.1f} s")
+        return 0
+
+    seconds, loaded = measure_import_time(repeat=args.repeat)
+    print(f"导入 {', '.join(CORE_MODULES)}：{seconds * 1000:.1f} ms（{args.repeat} 次中最短）")
+    if loaded:
+        print(f"错误：无界面导入加载了 {', '.join(loaded)}")
+        return 1
+    if args.budget is not None and seconds * 1000 > args.budget:
+        print(f"错误：导入耗时超过上限 {args.budget:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
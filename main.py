@@ -1,36 +1,60 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import time
-import tracemalloc
-import psutil
 import os
-import numpy as np
-from PIL import Image, ImageTk
 
 from game import Game
-from ai.greedy_ai import GreedyAI
-from ai.minimax_ai import MinimaxAI
+from board import WIN_SCORE
+from geometry import get_geometry
+from timecontrol import TimeControl
+from ai.registry import create_ai
+from engine import EngineClient, protocol
+
+# 各玩家的棋子颜色、目标区域颜色与颜色名称
+PIECE_COLORS = {1: "#FF4444", 2: "#4444FF", 3: "#33AA33", 4: "#E0B000", 5: "#AA44CC", 6: "#22AACC"}
+TARGET_COLORS = {1: "#FFCCCC", 2: "#CCCCFF", 3: "#CCEECC", 4: "#FFF0B0", 5: "#EED0F5", 6: "#C8EEF5"}
+COLOR_NAMES = {1: "红色", 2: "蓝色", 3: "绿色", 4: "黄色", 5: "紫色", 6: "青色"}
+
+# 界面可选的 AI（名称见 ai/registry.py）；MaxN / Paranoid / BestReply 为多人对局搜索，
+# Ponder 为在对手思考期间后台预测搜索的 Minimax
+AI_CHOICES = ["Greedy", "Minimax", "Ponder", "MaxN", "Paranoid", "BestReply"]
+
+# 不限时对局中子进程引擎的单步超时（秒）：引擎卡死时界面最多等待这么久，随后按兜底走法继续
+ISOLATED_MOVE_TIMEOUT = 30.0
+
+# 界面可选的棋盘类型
+BOARD_TYPES = {
+    "方格 12x12": "square",
+    "六角星 121 孔": "star",
+}
+
+# 界面可选的时间控制
+TIME_CONTROLS = {
+    "不限时": None,
+    "每方30秒+1秒": TimeControl(base=30, increment=1),
+    "每步1秒": TimeControl(movetime=1),
+}
 
 class GameGUI:
-    def __init__(self, root, p1_ai, p2_ai, game_duration):
+    def __init__(self, root, p1_ai, p2_ai, game_duration, time_control=None, more_ais=(), geometry=None):
         # 移除奖励点相关内容
         self.root = root
         self.game_duration = game_duration  # 游戏总时长（秒）
         
-        # 保存各个 agent 实例，确保正确显示算法名称
-        self.agents = {1: p1_ai, 2: p2_ai}
+        # 创建游戏实例（more_ais 为玩家 3 起的 AI，geometry 为棋盘几何）
+        self.game = Game(p1_ai, p2_ai, *more_ais, time_control=time_control, geometry=geometry)
         
-        # 创建游戏实例
-        self.game = Game(p1_ai, p2_ai)
+        # 保存各个 agent 实例，确保正确显示算法名称
+        self.agents = dict(self.game.players)
         
         # 定义棋子颜色与目标区域颜色的映射
-        self.piece_colors = {1: "#FF4444", 2: "#4444FF"}  # 更鲜艳的颜色
-        self.target_colors = {1: "#FFCCCC", 2: "#CCCCFF"}  # 更柔和的颜色
+        self.piece_colors = PIECE_COLORS  # 更鲜艳的颜色
+        self.target_colors = TARGET_COLORS  # 更柔和的颜色
         self.highlight_color = "#FFFF00"  # 高亮颜色
         self.valid_move_color = "#00FF00"  # 有效移动颜色
         
         # 定义颜色名称映射
-        self.color_names = {1: "红色", 2: "蓝色"}
+        self.color_names = COLOR_NAMES
         
         # 创建 Canvas 绘制棋盘
         self.canvas = tk.Canvas(root, width=600, height=600, bg="#F0F0F0", highlightthickness=0)
@@ -41,11 +65,14 @@ class GameGUI:
         self.info_frame.grid(row=0, column=1, sticky="n", padx=10, pady=10)
         self.create_scrollable_info_panel()
         
-        self.cell_size = 600 // 12
+        # 按几何的绘图坐标把棋盘缩放到 600x600 的画布内
+        self.setup_layout(600)
         
         # 记录每个玩家决策统计数据
-        self.stats = {i: {'decision_time': 0.0, 'cumulative_time': 0.0, 'decision_count': 0, 'latest_mem': 0} for i in range(1,3)}
+        self.stats = {i: {'decision_time': 0.0, 'cumulative_time': 0.0, 'decision_count': 0, 'latest_mem': 0, 'search': {}} for i in self.agents}
         self.start_time = time.perf_counter()
+        # 内存统计只在界面中使用，按需导入 psutil
+        import psutil
         self.process = psutil.Process(os.getpid())
         
         # 动画相关变量
@@ -56,6 +83,24 @@ class GameGUI:
         self.update_board()
         self.root.after(1000, self.game_step)
 
+    def setup_layout(self, canvas_size):
+        """根据几何的单位坐标计算每格在画布上的像素中心"""
+        layout = self.game.geometry.layout
+        xs = [x for x, _ in layout.values()]
+        ys = [y for _, y in layout.values()]
+        # 相邻格的单位距离为 1，两侧各留半格
+        span = max(max(xs) - min(xs), max(ys) - min(ys)) + 1
+        self.cell_size = canvas_size / span
+        offset_x = (canvas_size - (max(xs) - min(xs)) * self.cell_size) / 2
+        offset_y = (canvas_size - (max(ys) - min(ys)) * self.cell_size) / 2
+        self.cell_centers = {
+            pos: (offset_x + (x - min(xs)) * self.cell_size, offset_y + (y - min(ys)) * self.cell_size)
+            for pos, (x, y) in layout.items()
+        }
+
+    def cell_center(self, pos):
+        return self.cell_centers[(int(pos[0]), int(pos[1]))]
+
     def create_scrollable_info_panel(self):
         # 创建一个 canvas 实现滚动效果
         self.info_canvas = tk.Canvas(self.info_frame, width=300, height=600, bg="#F0F0F0", highlightthickness=0)
@@ -73,13 +118,15 @@ class GameGUI:
         # 每个玩家一块显示区域
         self.info_labels = {}
         self.player_frames = {}
-        for player in range(1, 3):
+        for player in self.agents:
             frame = tk.Frame(self.inner_info_frame, bd=2, relief="groove", padx=5, pady=5, bg="#FFFFFF")
             frame.pack(fill="x", pady=5)
             self.player_frames[player] = frame
             
             # 第一行动态显示【玩家号：算法 - 棋子颜色】
-            header_text = f"玩家 {player}: {self.agents[player].__class__.__name__} - {self.color_names[player]}"
+            agent = self.agents[player]
+            agent_name = getattr(agent, "display_name", agent.__class__.__name__)
+            header_text = f"玩家 {player}: {agent_name} - {self.color_names[player]}"
             header_label = tk.Label(frame, text=header_text, font=("Arial", 12, "bold"), bg="#FFFFFF", fg=self.piece_colors[player])
             header_label.pack(anchor="w")
             
@@ -92,6 +139,11 @@ class GameGUI:
             stat_labels['decision_count'].pack(anchor="w")
             stat_labels['latest_mem'] = tk.Label(frame, text="最新决策内存: -", bg="#FFFFFF")
             stat_labels['latest_mem'].pack(anchor="w")
+            stat_labels['search'] = tk.Label(frame, text="搜索: -", bg="#FFFFFF", justify="left", wraplength=260)
+            stat_labels['search'].pack(anchor="w")
+            if self.game.clock is not None:
+                stat_labels['clock'] = tk.Label(frame, text=f"剩余时间: {self.game.clock.format(player)}", bg="#FFFFFF")
+                stat_labels['clock'].pack(anchor="w")
             self.info_labels[player] = stat_labels
         
         # 整体信息
@@ -99,7 +151,7 @@ class GameGUI:
         self.total_mem_label.pack(anchor="w", pady=(10,0))
         self.elapsed_label = tk.Label(self.inner_info_frame, text="游戏运行时间: -", bg="#FFFFFF")
         self.elapsed_label.pack(anchor="w", pady=(0,10))
-        self.score_label = tk.Label(self.inner_info_frame, text="分数：\n玩家1: 0\n玩家2: 0", 
+        self.score_label = tk.Label(self.inner_info_frame, text=self.format_scores({p: 0 for p in self.agents}), 
                                   font=("Arial", 12, "bold"), bg="#FFFFFF")
         self.score_label.pack(anchor="w", pady=(10,0))
 
@@ -108,14 +160,10 @@ class GameGUI:
             return
             
         self.animation_in_progress = True
-        from_x, from_y = from_pos
-        to_x, to_y = to_pos
         
         # 计算起始和结束的像素坐标
-        start_x = from_y * self.cell_size + self.cell_size // 2
-        start_y = from_x * self.cell_size + self.cell_size // 2
-        end_x = to_y * self.cell_size + self.cell_size // 2
-        end_y = to_x * self.cell_size + self.cell_size // 2
+        start_x, start_y = self.cell_center(from_pos)
+        end_x, end_y = self.cell_center(to_pos)
         
         # 创建移动的棋子
         piece = self.canvas.create_oval(
@@ -154,171 +202,129 @@ class GameGUI:
         valid_moves = self.game.board.get_valid_moves(position)
         
         # 高亮显示有效移动
+        half = self.cell_size / 2
         for move in valid_moves:
-            x, y = move
+            x, y = self.cell_center(move)
             self.canvas.create_rectangle(
-                y * self.cell_size,
-                x * self.cell_size,
-                (y + 1) * self.cell_size,
-                (x + 1) * self.cell_size,
+                x - half,
+                y - half,
+                x + half,
+                y + half,
                 fill=self.valid_move_color,
                 stipple="gray50",
                 tags="highlight"
             )
 
     def update_info_panel(self, elapsed, total_mem):
-        for player in range(1, 3):
+        for player in self.agents:
             cur = self.stats[player]
             self.info_labels[player]['current_time'].config(text=f"当前决策耗时: {cur['decision_time']*1000:.1f} ms")
             self.info_labels[player]['cumulative_time'].config(text=f"累计决策耗时: {cur['cumulative_time']:.2f} s")
             self.info_labels[player]['decision_count'].config(text=f"决策次数: {cur['decision_count']}")
             self.info_labels[player]['latest_mem'].config(text=f"最新决策内存: {cur['latest_mem'] / 1024:.1f} KB")
+            self.info_labels[player]['search'].config(text=self.format_search(cur['search']))
+            if self.game.clock is not None:
+                self.info_labels[player]['clock'].config(text=f"剩余时间: {self.game.clock.format(player)}")
         self.total_mem_label.config(text=f"总内存消耗: {total_mem / (1024*1024):.1f} MB")
         self.elapsed_label.config(text=f"游戏运行时间: {elapsed:.1f} s")
         
         # 显示每个玩家所得的积分
-        p1_score = self.game.board.get_points_score(1)
-        p2_score = self.game.board.get_points_score(2)
-        score_text = f"积分：\n玩家1: {p1_score}\n玩家2: {p2_score}"
-        self.score_label.config(text=score_text)
+        scores = self.game.board.status()[0]
+        self.score_label.config(text=self.format_scores(scores))
+
+    @staticmethod
+    def format_search(info):
+        if not info:
+            return "搜索: -"
+        parts = [f"{label} {info[key]}" for key, label in (("depth", "深度"), ("score", "评分"), ("nodes", "节点"))
+                 if key in info]
+        text = "搜索: " + "  ".join(parts)
+        if info.get("ponder") == "hit":
+            text += "  (预测命中)"
+        if info.get("pv"):
+            text += "\n主要变例: " + " ".join(protocol.format_move(m) for m in info["pv"])
+        return text
+
+    def format_scores(self, scores):
+        return "积分：\n" + "\n".join(f"玩家{player}: {score}" for player, score in scores.items())
 
     def update_board(self):
         self.canvas.delete("all")
         board = self.game.board.board
-
-        # 1. 先绘制棋盘格背景
-        for i in range(12):
-            for j in range(12):
-                x1 = j * self.cell_size
-                y1 = i * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill="#EEE", outline="#AAA")
+        geometry = self.game.geometry
+        half = self.cell_size / 2
 
         # 移除奖励点绘制逻辑
-        # 3. 最后画棋子
-        for i in range(12):
-            for j in range(12):
-                if board[i, j] == 1:
-                    x = j * self.cell_size + self.cell_size // 2
-                    y = i * self.cell_size + self.cell_size // 2
-                    self.canvas.create_oval(
-                        x - 18, y - 18, x + 18, y + 18,
-                        fill="#E53935", outline="#B71C1C", width=3
-                    )
-                elif board[i, j] == 2:
-                    x = j * self.cell_size + self.cell_size // 2
-                    y = i * self.cell_size + self.cell_size // 2
-                    self.canvas.create_oval(
-                        x - 18, y - 18, x + 18, y + 18,
-                        fill="#1976D2", outline="#0D47A1", width=3
-                    )
-
-        # 绘制棋盘背景
-        for i in range(12):
-            for j in range(12):
-                x1 = j * self.cell_size
-                y1 = i * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                # 检查是否在玩家1的目标区域（右下角三角形）
-                if ((i == 11 and j == 11) or
-                    (i == 11 and j == 10) or (i == 10 and j == 11) or
-                    (i == 11 and j == 9) or (i == 10 and j == 10) or (i == 9 and j == 11) or
-                    (i == 11 and j == 8) or (i == 10 and j == 9) or (i == 9 and j == 10) or (i == 8 and j == 11)):
-                    fill_color = self.target_colors[1]
-                # 检查是否在玩家2的目标区域（左上角三角形）
-                elif ((i == 0 and j == 0) or
-                      (i == 0 and j == 1) or (i == 1 and j == 0) or
-                      (i == 0 and j == 2) or (i == 1 and j == 1) or (i == 2 and j == 0) or
-                      (i == 0 and j == 3) or (i == 1 and j == 2) or (i == 2 and j == 1) or (i == 3 and j == 0)):
-                    fill_color = self.target_colors[2]
-                else:
-                    fill_color = "white"
-                
-                # 绘制格子
+        for pos in geometry.cells:
+            x, y = self.cell_center(pos)
+            x1, y1, x2, y2 = x - half, y - half, x + half, y + half
+
+            # 目标区域按所属玩家着色
+            fill_color = "white"
+            for player, mask in geometry.target_masks.items():
+                if mask[pos]:
+                    fill_color = self.target_colors[player]
+                    break
+
+            # 绘制格子：方格棋盘画方格，六角星棋盘画圆孔
+            if geometry.name == "square":
                 self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill_color, outline="black", width=1)
-                
-                # 绘制棋子
-                if board[i, j] == 1:
-                    self.canvas.create_oval(
-                        x1 + 5, y1 + 5,
-                        x2 - 5, y2 - 5,
-                        fill=self.piece_colors[1],
-                        outline="black",
-                        width=2
-                    )
-                elif board[i, j] == 2:
-                    self.canvas.create_oval(
-                        x1 + 5, y1 + 5,
-                        x2 - 5, y2 - 5,
-                        fill=self.piece_colors[2],
-                        outline="black",
-                        width=2
-                    )
+            else:
+                self.canvas.create_oval(x1 + 2, y1 + 2, x2 - 2, y2 - 2, fill=fill_color, outline="#888", width=1)
+
+            # 绘制棋子
+            player = board[pos]
+            if player > 0:
+                inset = min(5, self.cell_size / 8)
+                self.canvas.create_oval(
+                    x1 + inset, y1 + inset,
+                    x2 - inset, y2 - inset,
+                    fill=self.piece_colors[player],
+                    outline="black",
+                    width=2
+                )
+
+    def show_victory(self, winner):
+        # 创建胜利动画
+        self.game.record.winner = winner
+        victory_text = f"玩家 {winner} ({self.color_names[winner]}) 胜利！"
+        print(victory_text)  # 在终端也打印胜利信息
+
+        self.canvas.create_text(
+            300, 300,
+            text=victory_text,
+            font=("Arial", 36, "bold"),
+            fill=self.piece_colors[winner],
+            tags="victory"
+        )
+
+        # 添加闪烁效果
+        def blink_text():
+            if not hasattr(self, '_blink_count'):
+                self._blink_count = 0
+            if self._blink_count < 10:  # 闪烁5次（10次颜色变化）
+                current_color = self.canvas.itemcget("victory", "fill")
+                new_color = "white" if current_color == self.piece_colors[winner] else self.piece_colors[winner]
+                self.canvas.itemconfig("victory", fill=new_color)
+                self._blink_count += 1
+                self.root.after(500, blink_text)
+
+        blink_text()
 
     def game_step(self):
-        # 检查分数胜利
-        p1_score = self.game.board.get_points_score(1)
-        p2_score = self.game.board.get_points_score(2)
-        if p1_score >= 12:
-            self.show_victory(1)
-            return
-        if p2_score >= 12:
-            self.show_victory(2)
-            return
+        # 计分与终局判定一次完成
+        scores, game_over = self.game.board.status()
+        for player, score in scores.items():
+            if score >= WIN_SCORE:
+                self.show_victory(player)
+                return
 
         elapsed = time.perf_counter() - self.start_time
         total_mem = self.process.memory_info().rss
         
-        if elapsed >= self.game_duration:
-            board = self.game.board.board
-            # 计算玩家1在右下角三角形区域的得分
-            p1_target_positions = [
-                (11, 11),  # 第1层
-                (11, 10), (10, 11),  # 第2层
-                (11, 9), (10, 10), (9, 11),  # 第3层
-                (11, 8), (10, 9), (9, 10), (8, 11)  # 第4层
-            ]
-            p1_score = sum(1 for pos in p1_target_positions if board[pos] == 1)
-
-            # 计算玩家2在左上角三角形区域的得分
-            p2_target_positions = [
-                (0, 0),  # 第1层
-                (0, 1), (1, 0),  # 第2层
-                (0, 2), (1, 1), (2, 0),  # 第3层
-                (0, 3), (1, 2), (2, 1), (3, 0)  # 第4层
-            ]
-            p2_score = sum(1 for pos in p2_target_positions if board[pos] == 2)
-
-            scores = {1: p1_score, 2: p2_score}
+        if elapsed >= self.game_duration or game_over:
             winner = max(scores, key=scores.get)
-            
-            # 创建胜利动画
-            victory_text = f"玩家 {winner} ({self.color_names[winner]}) 胜利！"
-            print(victory_text)  # 在终端也打印胜利信息
-            
-            self.canvas.create_text(
-                300, 300,
-                text=victory_text,
-                font=("Arial", 36, "bold"),
-                fill=self.piece_colors[winner],
-                tags="victory"
-            )
-            
-            # 添加闪烁效果
-            def blink_text():
-                if not hasattr(self, '_blink_count'):
-                    self._blink_count = 0
-                if self._blink_count < 10:  # 闪烁5次（10次颜色变化）
-                    current_color = self.canvas.itemcget("victory", "fill")
-                    new_color = "white" if current_color == self.piece_colors[winner] else self.piece_colors[winner]
-                    self.canvas.itemconfig("victory", fill=new_color)
-                    self._blink_count += 1
-                    self.root.after(500, blink_text)
-            
-            blink_text()
+            self.show_victory(winner)
             return
         
         if self.animation_in_progress:
@@ -328,30 +334,36 @@ class GameGUI:
         current_player = self.game.current_player
         current_ai = self.game.players[current_player]
         
+        import tracemalloc
         tracemalloc.start()
         start_decision = time.perf_counter()
 
-        # —— 如果 AI 真没选出任何 move，就随机选一手兜底 —— 
-        move = current_ai.choose_move(self.game.board.board)
+        move = self.game.request_move()
+        if self.game.forfeited is not None:
+            # 超时判负
+            tracemalloc.stop()
+            print(f"玩家 {current_player} 超时判负！")
+            self.show_victory(self.game.winner())
+            return
+        # —— 如果 AI 真没选出任何 move，就随机选一手兜底（使用对局的随机数生成器，可按种子复现）——
         if move is None:
             from ai.move_utils import get_all_moves
-            import random
 
-            # 本方所有合法走法
-            legal = get_all_moves(self.game.board.board, self.current_player)
-            if legal:
-                move = random.choice(legal)
-            else:
-                # 本方无路 → 先检查对方
-                other = 1 if self.current_player == 2 else 2
-                opp_legal = get_all_moves(self.game.board.board, other)
-                if not opp_legal:
-                    # 双方都卡住，直接结束
-                    self.end_game()
+            move = self.game.fallback_move()
+            if move is None:
+                # 本方无路 → 先检查其他玩家
+                tracemalloc.stop()
+                others_stuck = all(not get_all_moves(self.game.board.board, other)
+                                   for other in self.agents if other != current_player)
+                if others_stuck:
+                    # 所有玩家都卡住，直接结束
+                    self.show_victory(self.game.winner())
                     return
                 else:
-                    # 本方跳过，换对手出
-                    self.current_player = other
+                    # 本方跳过，换下一位玩家出
+                    self.game.apply_move(None)
+                    self.game.current_player = self.game.next_player(current_player)
+                    self.root.after(100, self.game_step)
                     return
 
         decision_time = time.perf_counter() - start_decision
@@ -362,16 +374,18 @@ class GameGUI:
         self.stats[current_player]['cumulative_time'] += decision_time
         self.stats[current_player]['decision_count'] += 1
         self.stats[current_player]['latest_mem'] = peak_mem
+        # 搜索类 AI（及子进程引擎）在 last_info 中给出深度、评分、节点数与主要变例
+        self.stats[current_player]['search'] = dict(getattr(current_ai, "last_info", None) or {})
         
         if move:
             from_pos, to_pos = move
             self.animate_piece_movement(from_pos, to_pos, current_player)
-            self.game.board.move_piece(from_pos, to_pos)
         else:
             print(f"玩家 {current_player} 没有合法移动！")
+        self.game.apply_move(move)
         
         self.update_info_panel(elapsed, total_mem)
-        self.game.current_player = 2 if self.game.current_player == 1 else 1
+        self.game.current_player = self.game.next_player(self.game.current_player)
         self.root.after(100, self.game_step)
 
 def create_styled_button(parent, text, command, width=20):
@@ -432,7 +446,7 @@ def create_selection_ui(root):
                         width=12, anchor="w")
     p1_label.pack(side=tk.LEFT, padx=5)
     p1_var = tk.StringVar(value="Greedy")
-    p1_menu = create_styled_combobox(p1_frame, ["Greedy", "Minimax"])
+    p1_menu = create_styled_combobox(p1_frame, AI_CHOICES)
     p1_menu.pack(side=tk.LEFT, padx=5)
     
     # 玩家2选择
@@ -444,9 +458,23 @@ def create_selection_ui(root):
                         width=12, anchor="w")
     p2_label.pack(side=tk.LEFT, padx=5)
     p2_var = tk.StringVar(value="Greedy")
-    p2_menu = create_styled_combobox(p2_frame, ["Greedy", "Minimax"])
+    p2_menu = create_styled_combobox(p2_frame, AI_CHOICES)
     p2_menu.pack(side=tk.LEFT, padx=5)
     
+    # 玩家3-6选择（多人对局时使用）
+    more_menus = []
+    for player in range(3, 7):
+        frame = tk.Frame(players_frame, bg="#f5f6f7")
+        frame.pack(pady=5)
+        label = tk.Label(frame, text=f"玩家 {player} ({COLOR_NAMES[player][0]}方):",
+                         font=("Arial", 11),
+                         bg="#f5f6f7", fg=PIECE_COLORS[player],
+                         width=12, anchor="w")
+        label.pack(side=tk.LEFT, padx=5)
+        menu = create_styled_combobox(frame, AI_CHOICES)
+        menu.pack(side=tk.LEFT, padx=5)
+        more_menus.append(menu)
+    
     # 游戏设置区域
     settings_frame = tk.LabelFrame(content_frame, text="游戏设置",
                                  font=("Arial", 12, "bold"),
@@ -466,21 +494,64 @@ def create_selection_ui(root):
     time_menu = create_styled_combobox(time_frame, ["1分钟", "2分钟", "3分钟"])
     time_menu.pack(side=tk.LEFT, padx=5)
     
+    # 棋盘与人数选择
+    board_frame = tk.Frame(settings_frame, bg="#f5f6f7")
+    board_frame.pack(pady=5)
+    board_label = tk.Label(board_frame, text="棋盘:",
+                          font=("Arial", 11),
+                          bg="#f5f6f7", fg="#2c3e50",
+                          width=12, anchor="w")
+    board_label.pack(side=tk.LEFT, padx=5)
+    board_menu = create_styled_combobox(board_frame, list(BOARD_TYPES))
+    board_menu.pack(side=tk.LEFT, padx=5)
+    
+    count_frame = tk.Frame(settings_frame, bg="#f5f6f7")
+    count_frame.pack(pady=5)
+    count_label = tk.Label(count_frame, text="玩家人数:",
+                          font=("Arial", 11),
+                          bg="#f5f6f7", fg="#2c3e50",
+                          width=12, anchor="w")
+    count_label.pack(side=tk.LEFT, padx=5)
+    count_menu = create_styled_combobox(count_frame, ["2", "3", "4", "6"])
+    count_menu.pack(side=tk.LEFT, padx=5)
+    
+    # 时间控制选择
+    clock_frame = tk.Frame(settings_frame, bg="#f5f6f7")
+    clock_frame.pack(pady=5)
+    clock_label = tk.Label(clock_frame, text="时间控制:",
+                          font=("Arial", 11),
+                          bg="#f5f6f7", fg="#2c3e50",
+                          width=12, anchor="w")
+    clock_label.pack(side=tk.LEFT, padx=5)
+    clock_menu = create_styled_combobox(clock_frame, list(TIME_CONTROLS))
+    clock_menu.pack(side=tk.LEFT, padx=5)
+    
+    # 是否在独立子进程中运行 AI
+    isolated_var = tk.BooleanVar(value=False)
+    isolated_check = tk.Checkbutton(settings_frame, text="AI 在独立进程中运行",
+                                    variable=isolated_var,
+                                    font=("Arial", 11), bg="#f5f6f7", fg="#2c3e50")
+    isolated_check.pack(pady=5)
+    
     # 开始游戏按钮
     start_button = create_styled_button(
         selection_frame,
         "开始游戏",
         lambda: start_game(p1_menu.get(), p2_menu.get(),
                          int(time_menu.get()[0]) * 60,
-                         root, selection_frame)
+                         root, selection_frame, isolated_var.get(),
+                         TIME_CONTROLS[clock_menu.get()],
+                         [menu.get() for menu in more_menus[:int(count_menu.get()) - 2]],
+                         BOARD_TYPES[board_menu.get()])
     )
     start_button.pack(pady=20)
     
     # 添加说明文字
     info_text = """
 游戏说明：
-• 红方和蓝方轮流移动棋子
-• 每方需要将棋子移动到对方起始区域
+• 各方按编号顺序轮流移动棋子
+• 每方需要将棋子移动到对面的目标区域
+• 方格棋盘支持 2/4 人，六角星棋盘支持 2/3/4/6 人
 • 比赛时间结束时，目标区域内棋子最多的一方获胜
 """
     info_label = tk.Label(selection_frame, text=info_text,
@@ -491,16 +562,27 @@ def create_selection_ui(root):
     
     return selection_frame
 
-def start_game(p1_type, p2_type, game_duration, root, selection_frame):
+def start_game(p1_type, p2_type, game_duration, root, selection_frame, isolated=False,
+               time_control=None, more_types=(), board_type="square"):
     """开始游戏的函数"""
-    # 创建AI实例
-    p1_ai = GreedyAI(1) if p1_type == "Greedy" else MinimaxAI(1)
-    p2_ai = GreedyAI(2) if p2_type == "Greedy" else MinimaxAI(2)
+    try:
+        geometry = get_geometry(board_type, 2 + len(more_types))
+    except ValueError as exc:
+        messagebox.showerror("无法开始游戏", str(exc))
+        return
+    # 创建AI实例；isolated 时 AI 运行在子进程引擎中，崩溃或卡死不会拖垮界面：
+    # 计时对局按本步截止时刻等待，不限时对局按 ISOLATED_MOVE_TIMEOUT 等待，超时则结束引擎进程
+    types = [p1_type, p2_type] + list(more_types)
+    if isolated:
+        move_timeout = ISOLATED_MOVE_TIMEOUT if time_control is None else None
+        ais = [EngineClient(t, p, move_timeout=move_timeout) for p, t in zip(geometry.players, types)]
+    else:
+        ais = [create_ai(t, p) for p, t in zip(geometry.players, types)]
     # 销毁选择界面
     selection_frame.destroy()
     
     # 创建游戏界面
-    GameGUI(root, p1_ai, p2_ai, game_duration)
+    GameGUI(root, ais[0], ais[1], game_duration, time_control, more_ais=ais[2:], geometry=geometry)
 
 # END OF CLASS GameGUI
 
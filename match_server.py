@@ -0,0 +1,393 @@
+"""
+本地对局服务器：在一个进程内用 asyncio 同时托管多局 AI 对局，供浏览器或脚本观战。
+
+AI 的计算放在进程池中执行（每个工作进程按配置缓存 AI 实例，跨对局复用），
+事件循环只负责调度对局、推送走法与响应请求。仅监听本机地址，不做鉴权。
+
+REST 接口（JSON）:
+  POST /games                 开始一局，请求体如
+                              {"players": ["Greedy", {"ai": "Minimax", "options": {"depth": 2}}],
+                               "board": "square", "time_control": "60+1", "max_plies": 600,
+                               "delay": 0.2, "seed": 42}
+                              返回 {"id": ...}；seed 为对局种子（默认随机），记入对局记录
+  GET  /games                 所有对局的概要
+  GET  /games/<id>            对局当前状态
+  GET  /games/<id>/record     对局记录（replay.GameRecord 的 JSON）
+  GET  /games/<id>/ws         WebSocket：先推送当前状态，之后每步推送一条 move 消息，
+                              终局时推送 end 消息
+
+用法:
+  python match_server.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import multiprocessing
+import signal
+import time
+import traceback
+from http import HTTPStatus
+
+from ai.registry import cached_ai, create_ai
+from game import Game
+from geometry import get_geometry
+from timecontrol import TimeControl
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+# 单局最多走的步数，达到后按目标区域内棋子数判定胜负（AI 可能陷入僵局）
+DEFAULT_MAX_PLIES = 1000
+MAX_BODY = 1 << 16
+
+def think(name, player_id, options, board, budget, seed=None):
+    """
+    在工作进程中计算一步，返回 (走法, 思考用时)。budget 为本步可用秒数（None 表示不限时），
+    截止时刻在工作进程内换算，避免依赖跨进程的时钟；用时不含在进程池中排队的时间。
+    seed 为本步种子（Game.move_seed），缓存的 AI 实例无论此前在哪一局用过都给出相同结果。
+    """
+    ai = cached_ai(name, player_id, options)
+    if seed is not None and hasattr(ai, "reseed"):
+        ai.reseed(seed)
+    start = time.perf_counter()
+    if budget is None:
+        move = ai.choose_move(board)
+    else:
+        move = ai.choose_move(board, deadline=start + budget)
+    return move, time.perf_counter() - start
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_player(spec):
+    """"Greedy" 或 {"ai": "Minimax", "options": {...}} -> (名称, 参数)"""
+    if isinstance(spec, str):
+        return spec, {}
+    if isinstance(spec, dict) and isinstance(spec.get("ai"), str):
+        return spec["ai"], dict(spec.get("options") or {})
+    raise HttpError(HTTPStatus.BAD_REQUEST, f"无法解析玩家配置：{spec!r}")
+
+
+class Match:
+    """一局托管中的对局及其观战者"""
+
+    def __init__(self, match_id, game, specs, max_plies=DEFAULT_MAX_PLIES, delay=0.0):
+        self.id = match_id
+        self.game = game
+        self.specs = specs
+        self.max_plies = max_plies
+        self.delay = delay
+        self.winner = None
+        self.error = None
+        self.subscribers = set()
+
+    @property
+    def over(self):
+        return self.winner is not None or self.error is not None
+
+    def state(self):
+        game = self.game
+        scores = game.board.status()[0]
+        return {
+            "id": self.id,
+            "geometry": list(game.geometry.key),
+            "players": {str(p): name for p, name in game.record.players.items()},
+            "current_player": game.current_player,
+            "ply": len(game.record),
+            "board": game.board.snapshot(),
+            "scores": {str(p): s for p, s in scores.items()},
+            "clock": {str(p): game.clock.format(p) for p in game.players} if game.clock else None,
+            "over": self.over,
+            "winner": self.winner,
+            "error": self.error,
+        }
+
+    def summary(self):
+        return {"id": self.id, "players": self.game.record.players, "ply": len(self.game.record),
+                "over": self.over, "winner": self.winner}
+
+    def publish(self, message):
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+
+
+class MatchServer:
+    def __init__(self, host="127.0.0.1", port=8765, workers=None):
+        self.host = host
+        self.port = port
+        # 工作进程在首次计算时才按需创建；fork 出的进程会继承当时打开的全部客户端连接，
+        # 使这些连接在服务器关闭后仍不结束，因此用 forkserver（不可用时用 spawn）启动
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                               mp_context=multiprocessing.get_context(method))
+        self.matches = {}
+        self.tasks = set()
+        self._ids = itertools.count(1)
+
+    # —— 对局 ——
+
+    def create_match(self, request):
+        players = request.get("players") or ["Greedy", "Greedy"]
+        if not isinstance(players, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "players 应为列表")
+        try:
+            specs = [_parse_player(p) for p in players]
+            geometry = get_geometry(request.get("board", "square"), len(specs))
+            control = request.get("time_control")
+            if control is not None and not isinstance(control, str):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "time_control 应为字符串，如 \"60+1\" 或 \"movetime=0.5\"")
+            control = TimeControl.parse(control) if control else None
+            max_plies = int(request.get("max_plies", DEFAULT_MAX_PLIES))
+            delay = float(request.get("delay", 0.0))
+            # 主进程中也创建一份 AI，用于校验配置并提供显示名称
+            ais = [create_ai(name, p, **options) for p, (name, options) in zip(geometry.players, specs)]
+        except (ValueError, TypeError) as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        if max_plies <= 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "max_plies 应为正整数")
+        if not delay >= 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "delay 应为非负数")
+        seed = request.get("seed")
+        # bool 是 int 的子类，需单独排除
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "seed 应为整数")
+        game = Game(*ais, time_control=control, geometry=geometry, seed=seed)
+        match = Match(next(self._ids), game, dict(zip(geometry.players, specs)), max_plies, delay)
+        self.matches[match.id] = match
+        task = asyncio.get_running_loop().create_task(self.run_match(match))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return match
+
+    async def run_match(self, match):
+        loop = asyncio.get_running_loop()
+        game = match.game
+        stuck = 0
+        try:
+            while not game.is_over() and len(game.record) < match.max_plies:
+                player = game.current_player
+                name, options = match.specs[player]
+                budget = None
+                if game.clock is not None:
+                    budget = max(game.clock.start(player, game.board.board) - time.perf_counter(), 0.0)
+                move, elapsed = await loop.run_in_executor(self.executor, think, name, player, options,
+                                                           game.board.board.copy(), budget,
+                                                           game.move_seed(player))
+                if game.clock is not None and game.clock.stop(elapsed):
+                    game.forfeited = player
+                    break
+                if move is None:
+                    move = game.fallback_move()
+                moved = game.apply_move(move)
+                # 所有玩家连续轮空即为僵局
+                stuck = 0 if moved else stuck + 1
+                match.publish({"type": "move", "ply": len(game.record), "player": player,
+                               "move": game.record.moves[-1][1], "board": game.board.snapshot()})
+                if stuck >= game.geometry.num_players:
+                    break
+                game.current_player = game.next_player(player)
+                if match.delay:
+                    await asyncio.sleep(match.delay)
+            match.winner = game.record.winner = game.winner()
+        except Exception as exc:  # AI 出错时结束该局，不影响其他对局
+            match.error = f"{exc.__class__.__name__}: {exc}"
+        match.publish({"type": "end", "winner": match.winner, "error": match.error})
+
+    def get_match(self, match_id):
+        try:
+            return self.matches[int(match_id)]
+        except (KeyError, ValueError):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"对局 {match_id} 不存在") from None
+
+    # —— HTTP ——
+
+    async def handle_client(self, reader, writer):
+        try:
+            method, path, headers, body = await self.read_request(reader)
+            parts = [p for p in path.split("?")[0].split("/") if p]
+            if len(parts) == 3 and parts[0] == "games" and parts[2] == "ws":
+                await self.websocket(self.get_match(parts[1]), headers, reader, writer)
+                return
+            status, payload = self.route(method, parts, body)
+        except HttpError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception:
+            # 未预料的错误：记录到日志，仍给客户端答复并关闭连接
+            traceback.print_exc()
+            if writer.is_closing():
+                return
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "服务器内部错误"}
+        await self.send_json(writer, status, payload)
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        try:
+            method, path, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "无法解析请求行") from None
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length 应为非负整数")
+        if length > MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "请求体过大")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    def route(self, method, parts, body):
+        if parts == ["games"]:
+            if method == "GET":
+                return HTTPStatus.OK, [m.summary() for m in self.matches.values()]
+            if method == "POST":
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    raise HttpError(HTTPStatus.BAD_REQUEST, "请求体不是合法的 JSON") from None
+                if not isinstance(request, dict):
+                    raise HttpError(HTTPStatus.BAD_REQUEST, "请求体应为 JSON 对象")
+                return HTTPStatus.CREATED, {"id": self.create_match(request).id}
+        elif len(parts) == 2 and parts[0] == "games" and method == "GET":
+            return HTTPStatus.OK, self.get_match(parts[1]).state()
+        elif len(parts) == 3 and parts[0] == "games" and parts[2] == "record" and method == "GET":
+            return HTTPStatus.OK, self.get_match(parts[1]).game.record.to_dict()
+        raise HttpError(HTTPStatus.NOT_FOUND, f"未知接口：{method} /{'/'.join(parts)}")
+
+    async def send_json(self, writer, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    # —— WebSocket ——
+
+    async def websocket(self, match, headers, reader, writer):
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "需要 WebSocket 升级请求")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        queue = asyncio.Queue()
+        queue.put_nowait(dict(match.state(), type="state"))
+        if match.over:
+            queue.put_nowait({"type": "end", "winner": match.winner, "error": match.error})
+        else:
+            match.subscribers.add(queue)
+        sender = asyncio.ensure_future(self.ws_send_loop(queue, writer))
+        receiver = asyncio.ensure_future(self.ws_receive_loop(reader, writer))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            match.subscribers.discard(queue)
+            sender.cancel()
+            receiver.cancel()
+            writer.close()
+
+    async def ws_send_loop(self, queue, writer):
+        while True:
+            message = await queue.get()
+            writer.write(ws_frame(json.dumps(message, ensure_ascii=False).encode("utf-8")))
+            await writer.drain()
+            if message["type"] == "end":
+                writer.write(ws_frame(b"", opcode=0x8))
+                await writer.drain()
+                return
+
+    async def ws_receive_loop(self, reader, writer):
+        """观战连接只需处理 ping 与关闭，其余客户端消息忽略"""
+        try:
+            while True:
+                opcode, payload = await read_ws_frame(reader)
+                if opcode == 0x8:
+                    return
+                if opcode == 0x9:
+                    writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"对局服务器已启动：http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ws_frame(payload, opcode=0x1):
+    """服务器发往客户端的单帧（不加掩码）"""
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+    return header + payload
+
+
+async def read_ws_frame(reader):
+    """读取客户端的一帧，返回 (opcode, 去掩码后的负载)"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地多局对局服务器（HTTP + WebSocket）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="AI 计算进程数，默认为 CPU 核心数")
+    args = parser.parse_args(argv)
+
+    server = MatchServer(args.host, args.port, args.workers)
+    # 收到 SIGTERM 时与 Ctrl+C 一样退出，并结束进程池中的工作进程
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+"""
+Perft：走法生成校验与吞吐基准
+
+从给定局面出发，枚举到深度 N 的所有走法序列并统计叶子节点数；
+不同的走法生成后端在同一局面上必须给出完全相同的计数（可按根走法分解对比），
+同时报告每个后端的节点/秒。
+
+用法示例:
+  python perft.py --depth 3
+  python perft.py --depth 3 --divide --backend reference
+  python perft.py --depth 2 --moves "3,0-4,0 8,11-7,11"
+  python perft.py --depth 2 --geometry star --players 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from board import Board
+from geometry import geometry_for, get_geometry
+from ai.move_utils import get_all_moves, get_moves_array
+
+
+def _grid_reference_moves(board, player_id):
+    """
+    12x12 方格棋盘的原始走法生成（逐格检查边界与方向，不依赖几何表），
+    作为优化实现的对照基准，请勿修改
+    """
+    def valid_moves(pos):
+        x, y = pos
+        moves = []
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < board.shape[0] and 0 <= ny < board.shape[1] and board[nx, ny] == 0:
+                moves.append((nx, ny))
+        return moves
+
+    def jump_moves(pos):
+        x, y = pos
+        moves = []
+        for dx, dy in [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]:
+            midx, midy = x + dx, y + dy
+            landingx, landingy = x + 2 * dx, y + 2 * dy
+            if (0 <= midx < board.shape[0] and 0 <= midy < board.shape[1] and board[midx, midy] != 0):
+                if (0 <= landingx < board.shape[0] and 0 <= landingy < board.shape[1] and board[landingx, landingy] == 0):
+                    moves.append((landingx, landingy))
+        return moves
+
+    moves = []
+    for pos in np.argwhere(board == player_id):
+        pos = (int(pos[0]), int(pos[1]))
+        moves.extend((pos, m) for m in valid_moves(pos))
+        moves.extend((pos, m) for m in jump_moves(pos))
+    return moves
+
+
+def _board_backend_moves(board, player_id):
+    """使用 Board 类自带的走法实现生成走法"""
+    wrapper = Board.__new__(Board)
+    wrapper.board = board
+    wrapper.geometry = geometry_for(board)
+    moves = []
+    for pos in np.argwhere(board == player_id):
+        pos = (int(pos[0]), int(pos[1]))
+        moves.extend((pos, m) for m in wrapper.get_valid_moves(pos))
+        moves.extend((pos, m) for m in wrapper.get_jump_moves(pos))
+    return moves
+
+
+def _vectorized_moves(board, player_id):
+    """move_utils.get_moves_array 的 NumPy 批量生成"""
+    src, dst, _ = get_moves_array(board, np.argwhere(board == player_id))
+    return [((a, b), (c, d)) for (a, b), (c, d) in zip(src.tolist(), dst.tolist())]
+
+
+# 走法生成后端：名称 -> fn(board, player_id) -> [(from_pos, to_pos), ...]
+GENERATORS = {
+    "reference": _grid_reference_moves,
+    "move_utils": get_all_moves,
+    "board": _board_backend_moves,
+    "vectorized": _vectorized_moves,
+}
+# 仅适用于特定棋盘的后端
+GENERATOR_GEOMETRIES = {
+    "reference": ("square",),
+}
+
+
+def backends_for(geometry):
+    return [name for name in GENERATORS
+            if geometry.name in GENERATOR_GEOMETRIES.get(name, (geometry.name,))]
+
+
+def next_player(player_id, players=(1, 2)):
+    return players[(players.index(player_id) + 1) % len(players)]
+
+
+def perft(board, player_id, depth, generate=get_all_moves, players=(1, 2)):
+    """统计从当前局面出发、深度为 depth 的叶子节点数（原地走子/撤销，不复制棋盘）"""
+    if depth == 0:
+        return 1
+    moves = generate(board, player_id)
+    if depth == 1:
+        return len(moves)
+    nxt = next_player(player_id, players)
+    nodes = 0
+    for from_pos, to_pos in moves:
+        board[to_pos] = board[from_pos]
+        board[from_pos] = 0
+        nodes += perft(board, nxt, depth - 1, generate, players)
+        board[from_pos] = board[to_pos]
+        board[to_pos] = 0
+    return nodes
+
+
+def divide(board, player_id, depth, generate=get_all_moves, players=(1, 2)):
+    """按根走法分解叶子节点数，返回 {(from_pos, to_pos): nodes}"""
+    result = {}
+    nxt = next_player(player_id, players)
+    for from_pos, to_pos in generate(board, player_id):
+        board[to_pos] = board[from_pos]
+        board[from_pos] = 0
+        result[(from_pos, to_pos)] = perft(board, nxt, depth - 1, generate, players)
+        board[from_pos] = board[to_pos]
+        board[to_pos] = 0
+    return result
+
+
+def verify(board, player_id, depth, backends=None, players=(1, 2)):
+    """
+    比较各后端在同一局面下的分解计数。
+    返回 (是否一致, {后端名: {根走法: 节点数}})
+    """
+    backends = backends or list(GENERATORS)
+    results = {name: divide(board.copy(), player_id, depth, GENERATORS[name], players)
+               for name in backends}
+    reference = results[backends[0]]
+    ok = all(r == reference for r in results.values())
+    return ok, results
+
+
+def benchmark(board, player_id, depth, backend, players=(1, 2)):
+    """返回 (叶子节点数, 耗时秒, 节点/秒)"""
+    work = board.copy()
+    start = time.perf_counter()
+    nodes = perft(work, player_id, depth, GENERATORS[backend], players)
+    elapsed = time.perf_counter() - start
+    return nodes, elapsed, nodes / elapsed if elapsed > 0 else float("inf")
+
+
+def parse_moves(text):
+    """解析 "r,c-r,c r,c-r,c ..." 形式的走法序列"""
+    moves = []
+    for token in text.split():
+        try:
+            src, dst = token.split("-")
+            (fr, fc), (tr, tc) = (tuple(int(v) for v in cell.split(",")) for cell in (src, dst))
+        except ValueError:
+            raise ValueError(f"无法解析的走法：{token}（应为 r,c-r,c）") from None
+        moves.append(((fr, fc), (tr, tc)))
+    return moves
+
+
+def format_move(move):
+    (fr, fc), (tr, tc) = move
+    return f"{fr},{fc}-{tr},{tc}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="中国跳棋走法生成 perft 校验与基准")
+    parser.add_argument("--depth", type=int, default=3, help="搜索深度")
+    parser.add_argument("--moves", default="", help="从初始局面先走的走法序列，如 \"3,0-4,0 8,11-7,11\"")
+    parser.add_argument("--player", type=int, default=None, help="轮到走棋的玩家（默认按走法序列推算）")
+    parser.add_argument("--backend", choices=list(GENERATORS), action="append",
+                        help="要测试的后端，可重复；默认全部适用于该棋盘的后端")
+    parser.add_argument("--geometry", default="square", help="棋盘类型：square / star")
+    parser.add_argument("--players", type=int, default=2, help="玩家人数")
+    parser.add_argument("--divide", action="store_true", help="按根走法输出分解计数")
+    args = parser.parse_args(argv)
+
+    try:
+        geometry = get_geometry(args.geometry, args.players)
+        moves = parse_moves(args.moves)
+    except ValueError as e:
+        parser.error(str(e))
+    players = geometry.players
+    board = Board(geometry)
+    rows, cols = board.board.shape
+    player = players[0]
+    for move in moves:
+        in_bounds = all(0 <= r < rows and 0 <= c < cols for r, c in move)
+        if not in_bounds or not board.move_piece(*move):
+            parser.error(f"非法走法：{format_move(move)}")
+        player = next_player(player, players)
+    if args.player is not None:
+        if args.player not in players:
+            parser.error(f"--player 应为 {'/'.join(map(str, players))} 之一：{args.player}")
+        player = args.player
+    backends = args.backend or backends_for(geometry)
+
+    ok, results = verify(board.board, player, args.depth, backends, players)
+    if args.divide:
+        for move, nodes in sorted(results[backends[0]].items()):
+            line = f"{format_move(move)}: {nodes}"
+            mismatched = [name for name in backends[1:] if results[name].get(move) != nodes]
+            if mismatched:
+                line += f"  不一致: {', '.join(mismatched)}"
+            print(line)
+        print()
+
+    for name in backends:
+        nodes, elapsed, nps = benchmark(board.board, player, args.depth, name, players)
+        print(f"{name:<12} depth={args.depth} nodes={nodes} time={elapsed:.3f}s nps={nps:,.0f}")
+    print("校验通过" if ok else "校验失败：各后端计数不一致")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
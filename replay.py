@@ -0,0 +1,184 @@
+"""
+对局记录与回放定位
+
+GameRecord 保存一局的棋盘类型、各玩家、初始局面与逐步走法，可存为 JSON；
+ReplayIndex 每隔 K 步保存一个关键帧（Board.snapshot() 的紧凑局面），
+定位到任意步数时从最近的关键帧出发最多重放 K-1 步，而不必从开局重放。
+
+对局记录中保存对局种子；用同样的 AI 重新对弈可逐步复现不计时的对局（verify_replay）。
+
+用法示例:
+  python replay.py game.json --ply 120
+  python replay.py game.json --verify Greedy Minimax:depth=3
+"""
+import argparse
+import json
+
+from board import Board
+from geometry import get_geometry
+
+RECORD_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 16
+
+
+class GameRecord:
+    def __init__(self, geometry_key, players, start=None, moves=None, winner=None,
+                 seed=None, agent_seeds=None):
+        """
+        参数:
+          geometry_key: 棋盘几何的 (名称, 人数)，见 Geometry.key
+          players: {玩家编号: AI 名称}
+          start: 初始局面（Board.snapshot()），默认为标准开局
+          moves: [(玩家编号, 走法或 None), ...]，None 表示该玩家无子可走、轮空
+          seed / agent_seeds: 对局种子与由它派生的 {玩家编号: AI 种子}，见 game.Game
+        """
+        self.geometry_key = tuple(geometry_key)
+        self.players = dict(players)
+        self.start = start or Board(get_geometry(*self.geometry_key)).snapshot()
+        self.moves = list(moves or [])
+        self.winner = winner
+        self.seed = seed
+        self.agent_seeds = dict(agent_seeds or {})
+
+    def __len__(self):
+        return len(self.moves)
+
+    def add_move(self, player_id, move):
+        if move is not None:
+            (fr, fc), (tr, tc) = move
+            move = ((int(fr), int(fc)), (int(tr), int(tc)))
+        self.moves.append((int(player_id), move))
+
+    def to_dict(self):
+        return {
+            "version": RECORD_VERSION,
+            "geometry": list(self.geometry_key),
+            "players": {str(p): name for p, name in self.players.items()},
+            "start": self.start,
+            "moves": [[p, [list(m[0]), list(m[1])] if m else None] for p, m in self.moves],
+            "winner": self.winner,
+            "seed": self.seed,
+            "agent_seeds": {str(p): s for p, s in self.agent_seeds.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != RECORD_VERSION:
+            raise ValueError(f"不支持的对局记录版本：{data.get('version')}")
+        moves = [(p, (tuple(m[0]), tuple(m[1])) if m else None) for p, m in data["moves"]]
+        players = {int(p): name for p, name in data["players"].items()}
+        agent_seeds = {int(p): s for p, s in (data.get("agent_seeds") or {}).items()}
+        return cls(data["geometry"], players, data["start"], moves, data.get("winner"),
+                   data.get("seed"), agent_seeds)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class ReplayIndex:
+    def __init__(self, record, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """一次顺序重放整局，每 keyframe_interval 步保存一个关键帧"""
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval 至少为 1")
+        self.record = record
+        self.interval = keyframe_interval
+        board = Board.from_snapshot(record.start)
+        self.keyframes = [board.snapshot()]
+        for ply, (_, move) in enumerate(record.moves, 1):
+            if move is not None:
+                board.move_piece(*move)
+            if ply % keyframe_interval == 0:
+                self.keyframes.append(board.snapshot())
+
+    def __len__(self):
+        """可定位的局面数（第 0 步至最后一步）"""
+        return len(self.record.moves) + 1
+
+    def board_at(self, ply):
+        """返回走完前 ply 步后的局面（新的 Board 对象）"""
+        if not 0 <= ply <= len(self.record.moves):
+            raise IndexError(f"步数 {ply} 超出范围 0..{len(self.record.moves)}")
+        base = ply // self.interval
+        board = Board.from_snapshot(self.keyframes[base])
+        for _, move in self.record.moves[base * self.interval:ply]:
+            if move is not None:
+                board.move_piece(*move)
+        return board
+
+    def move_at(self, ply):
+        """第 ply 步（从 1 开始）的 (玩家编号, 走法)"""
+        return self.record.moves[ply - 1]
+
+
+def verify_replay(record, ais):
+    """
+    用 ais（按玩家编号顺序）和记录中的种子重新对弈，逐步与记录比对。
+    返回第一处不一致的步数，完全一致时返回 None。计时对局的搜索深度取决于实际用时，不保证一致
+    """
+    from game import Game
+
+    if record.seed is None:
+        raise ValueError("对局记录中没有种子，无法复现")
+    game = Game(*ais, geometry=get_geometry(*record.geometry_key), seed=record.seed)
+    game.board.restore(record.start)
+    for ply, (player, expected) in enumerate(record.moves, 1):
+        game.current_player = player
+        move = game.request_move()
+        if move is None:
+            move = game.fallback_move()
+        if move is not None:
+            (fr, fc), (tr, tc) = move
+            move = ((int(fr), int(fc)), (int(tr), int(tc)))
+        if move != expected:
+            return ply
+        game.apply_move(move)
+    return None
+
+
+def parse_player(spec):
+    """"Minimax:depth=3,quiescence=2" -> ("Minimax", {"depth": 3, "quiescence": 2})"""
+    from engine import protocol
+
+    name, _, options = spec.partition(":")
+    return name, protocol.parse_options(options.split(",")) if options else {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查看对局记录中任意一步的局面")
+    parser.add_argument("record", help="对局记录 JSON 文件")
+    parser.add_argument("--ply", type=int, default=None, help="步数，默认最后一步")
+    parser.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL)
+    parser.add_argument("--verify", nargs="+", metavar="AI",
+                        help="按玩家编号顺序给出 AI（名称[:k=v,...]），按记录中的种子重新对弈并逐步比对")
+    args = parser.parse_args(argv)
+
+    record = GameRecord.load(args.record)
+    if args.verify:
+        from ai.registry import create_ai
+        players = sorted(record.players)
+        if len(args.verify) != len(players):
+            parser.error(f"对局有 {len(players)} 名玩家，--verify 给出了 {len(args.verify)} 个 AI")
+        ais = [create_ai(name, p, **options) for p, (name, options) in zip(players, map(parse_player, args.verify))]
+        ply = verify_replay(record, ais)
+        if ply is None:
+            print(f"复现一致：{len(record)} 步（种子 {record.seed}）")
+            return 0
+        print(f"第 {ply} 步不一致：记录为 {record.moves[ply - 1][1]}")
+        return 1
+    index = ReplayIndex(record, args.keyframe_interval)
+    ply = len(record) if args.ply is None else args.ply
+    if ply > 0:
+        player, move = index.move_at(ply)
+        print(f"第 {ply} 步：玩家 {player} {move if move else '轮空'}")
+    index.board_at(ply).render()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,36 @@
+"""局面评估缓存：距离评估与不同神经网络评估器共用一个缓存时互不串用结果"""
+from ai.eval_cache import EvalCache
+from ai.minimax_ai import MinimaxAI
+from ai.nn_eval import MLPEvaluator
+from board import Board
+from geometry import get_geometry
+
+
+def test_distance_and_nn_evaluations_do_not_mix():
+    geometry = get_geometry("square", 2)
+    board = Board(geometry).board
+    cache = EvalCache()
+    net = MLPEvaluator.random(geometry, 1, seed=0)
+    other = MLPEvaluator.random(geometry, 1, seed=1)
+    nn_ai = MinimaxAI(1, evaluator=net, eval_cache=cache)
+    other_ai = MinimaxAI(1, evaluator=other, eval_cache=cache)
+    distance_ai = MinimaxAI(1, eval_cache=cache)
+    for ai in (nn_ai, other_ai, distance_ai):
+        ai.geometry = geometry
+
+    assert nn_ai.evaluate(board) == net.evaluate(board)
+    assert other_ai.evaluate(board) == other.evaluate(board)
+    assert distance_ai.evaluate(board) == distance_ai.compute_evaluation(board)
+    assert cache.misses == 3
+
+
+def test_same_weights_share_entries():
+    geometry = get_geometry("square", 2)
+    board = Board(geometry).board
+    cache = EvalCache()
+    first = MinimaxAI(1, evaluator=MLPEvaluator.random(geometry, 1, seed=0), eval_cache=cache)
+    second = MinimaxAI(1, evaluator=MLPEvaluator.random(geometry, 1, seed=0), eval_cache=cache)
+    first.geometry = second.geometry = geometry
+    first.evaluate(board)
+    second.evaluate(board)
+    assert cache.hits == 1
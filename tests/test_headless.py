@@ -0,0 +1,15 @@
+"""无界面入口：导入核心模块时不加载界面、渲染和性能分析依赖，且冷启动导入耗时不回退"""
+from headless import CORE_MODULES, FORBIDDEN_MODULES, measure_import_time
+
+# 导入耗时上限（秒）：本地约 0.08 秒，留足余量以免在较慢的机器上误报
+IMPORT_BUDGET = 0.5
+
+
+def test_headless_import_skips_gui_modules():
+    _, loaded = measure_import_time(("headless",) + CORE_MODULES, repeat=1)
+    assert loaded == [], f"无界面导入加载了 {loaded}（禁止：{FORBIDDEN_MODULES}）"
+
+
+def test_headless_import_time_within_budget():
+    seconds, _ = measure_import_time(("headless",) + CORE_MODULES, repeat=3)
+    assert seconds < IMPORT_BUDGET
@@ -0,0 +1,22 @@
+"""perft 命令行：非法参数以用法错误退出，而不是抛出异常"""
+import pytest
+
+import perft
+
+
+@pytest.mark.parametrize("argv", [
+    ["--player", "5"],
+    ["--players", "5"],
+    ["--geometry", "hex"],
+    ["--moves", "abc"],
+    ["--moves", "3,0-99,0"],
+])
+def test_invalid_arguments_are_usage_errors(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        perft.main(["--depth", "1", *argv])
+    assert exc.value.code == 2
+    assert "error:" in capsys.readouterr().err
+
+
+def test_valid_player_passes():
+    assert perft.main(["--depth", "1", "--player", "2"]) == 0
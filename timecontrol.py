@@ -0,0 +1,115 @@
+"""
+时间控制：基础时间 + 每步加秒、每位玩家独立计时、或固定每步用时。
+
+GameClock 负责为每一步分配思考时间（根据对局阶段与剩余时间），把截止时刻
+（time.perf_counter() 时间轴上的绝对值）交给 AI 的 choose_move(board, deadline)，
+并在走子后扣除实际用时；超出剩余时间的一方判负。
+"""
+import time
+
+from board import target_status
+from geometry import geometry_for
+
+# 预计剩余步数的上下限：开局时按较多的剩余步数分配，接近终局时按较少的分配
+MAX_MOVES_TO_GO = 40
+MIN_MOVES_TO_GO = 8
+# 每步至少保留的余量（秒），用于走子、通信等开销
+SAFETY_MARGIN = 0.05
+
+
+class TimeControl:
+    def __init__(self, base=None, increment=0.0, movetime=None):
+        """
+        参数:
+          base: 每位玩家的基础时间（秒）；为 None 时不计总用时
+          increment: 每走一步后增加的时间（秒）
+          movetime: 固定每步用时（秒）
+        """
+        if base is None and movetime is None:
+            raise ValueError("base 与 movetime 至少需要指定一个")
+        # 写成 not x > 0 以同时排除 NaN
+        if base is not None and not base > 0:
+            raise ValueError(f"基础时间应为正数：{base}")
+        if movetime is not None and not movetime > 0:
+            raise ValueError(f"每步用时应为正数：{movetime}")
+        if not increment >= 0:
+            raise ValueError(f"每步加时不能为负：{increment}")
+        self.base = base
+        self.increment = increment
+        self.movetime = movetime
+
+    @classmethod
+    def parse(cls, text):
+        """解析 "60+1"（基础 60 秒、每步加 1 秒）或 "movetime=0.5" 形式的描述"""
+        text = text.strip()
+        if text.startswith("movetime="):
+            return cls(movetime=float(text.split("=", 1)[1]))
+        base, _, increment = text.partition("+")
+        return cls(base=float(base), increment=float(increment or 0))
+
+    def __str__(self):
+        if self.base is None:
+            return f"movetime={self.movetime:g}"
+        return f"{self.base:g}+{self.increment:g}"
+
+
+class GameClock:
+    def __init__(self, control, players=(1, 2)):
+        self.control = control
+        self.remaining = {p: control.base for p in players} if control.base is not None else {}
+        self.used = {p: 0.0 for p in players}
+        self.flagged = None
+        self._running = None
+
+    def phase_remaining(self, board, player_id):
+        """对局剩余进度估计：1 表示开局，0 表示全部棋子已进入目标区"""
+        geometry = geometry_for(board)
+        scores = target_status(board, geometry)[0]
+        size = len(geometry.target_cells[player_id])
+        return 1.0 - min(scores.get(player_id, 0), size) / size
+
+    def allocate(self, player_id, board):
+        """为本步分配思考时间（秒）"""
+        control = self.control
+        if control.base is None:
+            return max(control.movetime - SAFETY_MARGIN, 0.0)
+        remaining = self.remaining[player_id]
+        moves_to_go = MIN_MOVES_TO_GO + (MAX_MOVES_TO_GO - MIN_MOVES_TO_GO) * self.phase_remaining(board, player_id)
+        budget = remaining / moves_to_go + control.increment * 0.8
+        # 无论如何不超过剩余时间的一半，避免一步用光时间
+        budget = min(budget, remaining * 0.5)
+        if control.movetime is not None:
+            budget = min(budget, control.movetime)
+        return max(budget - SAFETY_MARGIN, 0.0)
+
+    def start(self, player_id, board):
+        """开始为 player_id 计时，返回本步的截止时刻"""
+        now = time.perf_counter()
+        self._running = (player_id, now)
+        return now + self.allocate(player_id, board)
+
+    def stop(self, elapsed=None):
+        """
+        停止计时并扣除用时；返回该玩家是否超时。
+        elapsed: 实际思考用时（秒），在其他进程中计算时由调用方给出，不计排队等待的时间
+        """
+        player_id, started = self._running
+        self._running = None
+        if elapsed is None:
+            elapsed = time.perf_counter() - started
+        self.used[player_id] += elapsed
+        control = self.control
+        overrun = control.movetime is not None and control.base is None and elapsed > control.movetime
+        if control.base is not None:
+            self.remaining[player_id] -= elapsed
+            overrun = self.remaining[player_id] < 0
+            if not overrun:
+                self.remaining[player_id] += control.increment
+        if overrun:
+            self.flagged = player_id
+        return overrun
+
+    def format(self, player_id):
+        if self.control.base is None:
+            return f"每步 {self.control.movetime:g} s"
+        return f"{max(self.remaining[player_id], 0.0):.1f} s"
@@ -0,0 +1,276 @@
+"""
+自我对弈训练：用现有 AI 生成对局 -> 拟合评估权重 -> 门槛对局 -> 晋升新权重。
+
+每一轮：
+  1. 多进程并行自我对弈（当前最佳评估器的 MinimaxAI，按 epsilon 概率随机走子以增加多样性），
+     每局的全部局面以可用格的 int8 数组写入 data_XXX.npz，标签为各玩家视角的终局结果
+  2. 在最近若干轮的数据上为每位玩家拟合评估器：默认线性模型（岭回归闭式解），
+     也可选小型 MLP（NumPy 小批量 Adam）
+  3. 候选权重与当前最佳权重进行门槛对局（交换座位），胜率达到门槛才晋升为 best_p<编号>.npz
+
+全部在 CPU 上离线运行，仅依赖 NumPy。
+
+用法示例:
+  python train.py --iterations 3 --games 64 --workers 4 --out weights
+  python train.py --model mlp --hidden 32 --gate-games 40
+"""
+import argparse
+import concurrent.futures
+import glob
+import os
+import random
+import shutil
+
+import numpy as np
+
+from ai.minimax_ai import MinimaxAI
+from ai.move_utils import get_all_moves
+from ai.nn_eval import MLPEvaluator
+from board import Board
+from geometry import get_geometry
+
+DEFAULT_MAX_PLIES = 300
+# 候选权重晋升所需的门槛对局得分率（胜 1 分、和 0.5 分）
+DEFAULT_GATE_THRESHOLD = 0.55
+
+
+def game_result(board, geometry):
+    """
+    各玩家视角的终局结果 {玩家: 1 / 0 / -1}：先比目标区域内棋子数，相同时比到目标的总距离；
+    AI 常在终局前陷入僵局，达到步数上限时也按此判定
+    """
+    scores = board.status()[0]
+    keys = {p: (scores[p], -int(geometry.target_distance[p][board.board == p].sum()))
+            for p in geometry.players}
+    best = max(keys.values())
+    leaders = [p for p, key in keys.items() if key == best]
+    if len(leaders) == len(keys):
+        return {p: 0 for p in keys}
+    # 唯一领先者记胜；多人并列领先记和；其余记负
+    lead = 1 if len(leaders) == 1 else 0
+    return {p: lead if p in leaders else -1 for p in keys}
+
+
+def play_game(geometry_key, weights, depth, max_plies, epsilon, seed, opening=0):
+    """
+    在工作进程中下一局。weights 为 {玩家: 权重文件路径或 None（距离评估）}；
+    前 opening 步随机走子，其后每步以 epsilon 的概率随机走子。
+    返回 (局面数组 (步数+1, 格数) int8, 结果数组 (人数,) float32)
+    """
+    rng = random.Random(seed)
+    geometry = get_geometry(*geometry_key)
+    board = Board(geometry)
+    ais = {p: MinimaxAI(p, depth=depth, evaluator=weights.get(p)) for p in geometry.players}
+    positions = [board.board[geometry.valid].astype(np.int8)]
+    player = geometry.players[0]
+    stuck = 0
+    for ply in range(max_plies):
+        if board.is_game_over():
+            break
+        if ply < opening or rng.random() < epsilon:
+            moves = get_all_moves(board.board, player, geometry=geometry)
+            move = rng.choice(moves) if moves else None
+        else:
+            move = ais[player].choose_move(board.board)
+        if move is not None and board.move_piece(*move):
+            stuck = 0
+            positions.append(board.board[geometry.valid].astype(np.int8))
+        else:
+            stuck += 1
+            if stuck >= geometry.num_players:
+                break
+        player = geometry.next_player(player)
+    result = game_result(board, geometry)
+    return np.stack(positions), np.array([result[p] for p in geometry.players], dtype=np.float32)
+
+
+def self_play(geometry, weights, games, workers, depth, max_plies, epsilon, seed=0):
+    """并行生成 games 局自我对弈，返回 (局面, 标签)；标签为 (局面数, 人数)"""
+    positions, labels = [], []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_game, geometry.key, weights, depth, max_plies, epsilon, seed + i)
+                   for i in range(games)]
+        for future in futures:
+            cells, result = future.result()
+            positions.append(cells)
+            labels.append(np.repeat(result[None], len(cells), axis=0))
+    return np.concatenate(positions), np.concatenate(labels)
+
+
+def save_data(path, geometry, positions, labels):
+    name, num_players = geometry.key
+    np.savez_compressed(path, geometry=name, num_players=num_players, positions=positions, labels=labels)
+
+
+def load_data(paths):
+    positions, labels = [], []
+    for path in paths:
+        data = np.load(path)
+        positions.append(data["positions"])
+        labels.append(data["labels"])
+    return np.concatenate(positions), np.concatenate(labels)
+
+
+def scaled_labels(prior, X, y):
+    """
+    按 y ≈ a * 距离评估 + c 把标签换算到距离评估的尺度 (y - c) / a；
+    标签与距离评估不正相关（数据不可用）时返回 None
+    """
+    base = prior.evaluate_features(X)
+    a, c = np.linalg.lstsq(np.stack([base, np.ones_like(base)], axis=1), y, rcond=None)[0]
+    return (y - c) / a if a > 0 else None
+
+
+def fit_linear(geometry, player_id, positions, labels, l2=100.0):
+    """
+    岭回归闭式解，返回无隐藏层的 MLPEvaluator。正则项把权重拉向距离评估而不是零：
+      min |Xw + b - y'|^2 + l2 * 样本数 * |w - w0|^2
+    其中 w0 为距离评估的权重，y' 为换算到距离评估尺度的标签；
+    l2 越大越接近距离评估，数据不足时退化为距离评估
+    """
+    prior = MLPEvaluator.from_distance(geometry, player_id, hidden=())
+    X = prior.cell_features(positions).astype(np.float64)
+    y = scaled_labels(prior, X, labels[:, geometry.players.index(player_id)].astype(np.float64))
+    if y is None:
+        return prior
+    w0 = prior.layers[0][0][:, 0].astype(np.float64)
+    X = np.hstack([X, np.ones((len(X), 1))])
+    reg = l2 * len(X) * np.eye(X.shape[1])
+    reg[-1, -1] = 0  # 偏置不做正则
+    rhs = X.T @ y
+    rhs[:-1] += l2 * len(X) * w0
+    w = np.linalg.solve(X.T @ X + reg, rhs)
+    return MLPEvaluator([(w[:-1, None], w[-1:])], geometry, player_id)
+
+
+def fit_mlp(geometry, player_id, positions, labels, hidden=(32,), epochs=3, batch_size=256,
+            lr=1e-4, seed=0):
+    """
+    以与距离评估等价的网络为起点，用小批量 Adam 在换算后的标签上微调（均方误差），纯 NumPy 实现
+    """
+    rng = np.random.default_rng(seed)
+    net = MLPEvaluator.from_distance(geometry, player_id, hidden, seed)
+    X = net.cell_features(positions)
+    y = scaled_labels(net, X, labels[:, geometry.players.index(player_id)])
+    if y is None:
+        return net
+    y = y.astype(np.float32)
+    params = [p for layer in net.layers for p in layer]
+    moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    step = 0
+    for _ in range(epochs):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), batch_size):
+            idx = order[start:start + batch_size]
+            # 前向，保存各层输入
+            activations = [X[idx]]
+            for W, b in net.layers[:-1]:
+                activations.append(np.maximum(activations[-1] @ W + b, 0))
+            W, b = net.layers[-1]
+            out = (activations[-1] @ W + b)[:, 0]
+            # 反向
+            grad = (2 * (out - y[idx]) / len(idx))[:, None]
+            grads = []
+            for i in range(len(net.layers) - 1, -1, -1):
+                W, b = net.layers[i]
+                grads.append((activations[i].T @ grad, grad.sum(axis=0)))
+                if i:
+                    grad = (grad @ W.T) * (activations[i] > 0)
+            grads = [g for layer in reversed(grads) for g in layer]
+            step += 1
+            for p, g, (m, v) in zip(params, grads, moments):
+                m *= 0.9
+                m += 0.1 * g
+                v *= 0.999
+                v += 0.001 * g * g
+                p -= lr * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+    # 权重已就地更新，重新计算权重摘要
+    net.set_layers(net.layers)
+    return net
+
+
+def gate(geometry, candidate, incumbent, games, workers, depth, max_plies, seed=0, opening=4):
+    """
+    门槛对局：候选权重与当前最佳权重交替执各座位，返回候选方得分率。
+    candidate / incumbent 为 {玩家: 权重文件路径或 None}；
+    每局先随机走 opening 步，避免确定性的 AI 反复下出同一局
+    """
+    points = 0.0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for i in range(games):
+            # 各座位轮流由候选方执棋，其余座位为当前最佳
+            seat = geometry.players[i % geometry.num_players]
+            weights = {p: candidate[p] if p == seat else incumbent[p] for p in geometry.players}
+            futures.append((seat, pool.submit(play_game, geometry.key, weights, depth, max_plies, 0.0,
+                                              seed + i, opening)))
+        for seat, future in futures:
+            result = future.result()[1][geometry.players.index(seat)]
+            points += (result + 1) / 2
+    return points / games
+
+
+def train(args):
+    geometry = get_geometry(args.geometry, args.players)
+    os.makedirs(args.out, exist_ok=True)
+    best = {p: os.path.join(args.out, f"best_p{p}.npz") for p in geometry.players}
+    incumbent = {p: path if os.path.exists(path) else None for p, path in best.items()}
+
+    for iteration in range(args.iterations):
+        round_id = len(glob.glob(os.path.join(args.out, "data_*.npz")))
+        seed = args.seed + round_id * 100_000
+        positions, labels = self_play(geometry, incumbent, args.games, args.workers, args.depth,
+                                      args.max_plies, args.epsilon, seed)
+        data_path = os.path.join(args.out, f"data_{round_id:03d}.npz")
+        save_data(data_path, geometry, positions, labels)
+        print(f"第 {iteration + 1} 轮：{args.games} 局、{len(positions)} 个局面 -> {data_path}")
+
+        window = sorted(glob.glob(os.path.join(args.out, "data_*.npz")))[-args.window:]
+        positions, labels = load_data(window)
+        candidate = {}
+        for p in geometry.players:
+            if args.model == "linear":
+                net = fit_linear(geometry, p, positions, labels, args.l2)
+            else:
+                net = fit_mlp(geometry, p, positions, labels, tuple(args.hidden), args.epochs,
+                              lr=args.lr, seed=seed)
+            candidate[p] = os.path.join(args.out, f"candidate_p{p}.npz")
+            net.save(candidate[p])
+
+        score = gate(geometry, candidate, incumbent, args.gate_games, args.workers, args.depth,
+                     args.max_plies, seed + 50_000)
+        if score >= args.threshold:
+            for p in geometry.players:
+                shutil.copyfile(candidate[p], best[p])
+            incumbent = dict(best)
+            print(f"  门槛对局得分率 {score:.3f} >= {args.threshold}，晋升为新的最佳权重")
+        else:
+            print(f"  门槛对局得分率 {score:.3f} < {args.threshold}，保留当前最佳权重")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="自我对弈训练评估权重")
+    parser.add_argument("--geometry", default="square", help="棋盘类型：square / star")
+    parser.add_argument("--players", type=int, default=2, help="玩家人数")
+    parser.add_argument("--iterations", type=int, default=1, help="训练轮数")
+    parser.add_argument("--games", type=int, default=64, help="每轮自我对弈局数")
+    parser.add_argument("--workers", type=int, default=None, help="对弈进程数，默认为 CPU 核心数")
+    parser.add_argument("--depth", type=int, default=1, help="自我对弈与门槛对局的搜索深度")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="单局步数上限")
+    parser.add_argument("--epsilon", type=float, default=0.1, help="自我对弈中随机走子的概率")
+    parser.add_argument("--window", type=int, default=4, help="拟合时使用最近几轮的数据")
+    parser.add_argument("--model", choices=["linear", "mlp"], default="linear")
+    parser.add_argument("--l2", type=float, default=100.0, help="线性模型的 L2 正则系数")
+    parser.add_argument("--hidden", type=int, nargs="*", default=[32], help="MLP 隐藏层宽度")
+    parser.add_argument("--epochs", type=int, default=3, help="MLP 训练轮数")
+    parser.add_argument("--lr", type=float, default=1e-4, help="MLP 学习率")
+    parser.add_argument("--gate-games", type=int, default=20, help="门槛对局局数")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_GATE_THRESHOLD, help="晋升所需得分率")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="weights", help="数据与权重目录")
+    return train(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())